@@ -1,6 +1,13 @@
+import os
+import sys
+
 import requests
 from bs4 import BeautifulSoup
 
+# 녹화/재생(LOL_HTTP_RECORD_DIR / LOL_HTTP_BASE_URL)은 stere/http_record.py 와 같은 방식
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stere"))
+import http_record  # noqa: E402
+
 url = "https://op.gg/ko/lol/summoners/kr/Hide%20on%20bush-KR1/mastery"
 
 
@@ -8,7 +15,7 @@ headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122 Safari/537.36"
 }
 
-res = requests.get(url, headers=headers)
+res = http_record.install(requests.Session()).get(url, headers=headers)
 
 soup = BeautifulSoup(res.text, "html.parser")
 
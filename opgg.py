@@ -1,8 +1,15 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote
-import re
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 녹화/재생(http_record)과 파서 백엔드 선택(opgg_parse, LOL_HTML_PARSER / LOL_OPGG_EXTRACT)은 stere/ 앱과 공용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stere"))
+import http_record  # noqa: E402
+import opgg_parse  # noqa: E402
 
 st.set_page_config(page_title="OP.GG 챔피언 요약", layout="wide")
 
@@ -33,110 +40,68 @@ MASTERY_URL = f"{BASE_URL}/{encoded_name}/mastery"
 HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
+PAGE_DEADLINE = 10  # 페이지별 마감 시간(초)
+_session = http_record.install(requests.Session())
 
 # --- HTML 요청 ---
 def fetch(url):
     try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
+        res = _session.get(url, headers=HEADERS, timeout=PAGE_DEADLINE)
         res.raise_for_status()
-        return res.text
+        return res.content  # 디코딩은 파서가 처리
     except Exception as e:
-        st.error(f"페이지 요청 실패: {e}")
-        return None
-
+        return e
 
-# ----------------------------------------------------
-# 🟦 1) 챔피언 통계(모스트픽) 파싱
-# ----------------------------------------------------
-def parse_champions(html):
-    soup = BeautifulSoup(html, "html.parser")
 
-    champs = []
-    rows = soup.select("tr, div.ChampionBox, div.champion")
-
-    valid_rows = []
-    for r in rows:
-        text = r.get_text(" ", strip=True)
-        if "모든 챔피언" in text:
-            continue
-        if "vs" in text:
-            continue
-        if re.search(r"승|패|%", text):
-            valid_rows.append(r)
-
-    valid_rows = valid_rows[:5]
-
-    for r in valid_rows:
-        img_tag = r.select_one("img[src*='champion']")
-        img = img_tag.get("src") if img_tag else None
-
-        name = img_tag.get("alt") if img_tag else "Unknown"
-
-        text = r.get_text(" ", strip=True)
-        winrate = re.search(r"(\d{1,3}\.?\d*)%", text)
-        wins = re.search(r"(\d+)\s*승", text)
-        losses = re.search(r"(\d+)\s*패", text)
-
-        champs.append({
-            "name": name,
-            "img": img,
-            "winrate": winrate.group(1) + "%" if winrate else "-",
-            "wins": wins.group(1) if wins else "-",
-            "losses": losses.group(1) if losses else "-"
-        })
-
-    return champs
+# 챔피언 / 숙련도 페이지를 동시에 요청 (스레드에서는 st.* 호출 금지 → 에러는 값으로 반환)
+# 마감은 전체 기준 한 번 (PAGE_DEADLINE 초), 멈춘 요청은 기다리지 않고 버림 (with 블록 종료 시 대기 방지)
+def fetch_all(*urls):
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    deadline = time.monotonic() + PAGE_DEADLINE
+    try:
+        futures = [pool.submit(fetch, u) for u in urls]
+        results = []
+        for f in futures:
+            try:
+                results.append(f.result(timeout=max(0.0, deadline - time.monotonic())))
+            except Exception as e:
+                results.append(e)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    pages = []
+    for r in results:
+        if isinstance(r, Exception):
+            st.error(f"페이지 요청 실패: {r}")
+            pages.append(None)
+        else:
+            pages.append(r)
+    return pages
 
 
 # ----------------------------------------------------
-# 🟩 2) 숙련도(Mastery) Top5 파싱
+# 🟦 챔피언 통계 / 🟩 숙련도 파싱 — stere/opgg_parse 공용 파서 (상위 5개)
 # ----------------------------------------------------
-def parse_mastery(html):
-    soup = BeautifulSoup(html, "html.parser")
-
-    container = soup.find('div', attrs={"id": "content-container"})
-    if not container:
-        return []
-
-    rows = container.find_all('div', attrs={"data-tooltip-id": "opgg-tooltip"})
-    rows = rows[:5]  # 상위 5개만
-
-    mastery_list = []
-
-    for r in rows:
-        # 이미지 + 이름
-        img_tag = r.find("img")
-        img = img_tag["src"] if img_tag else None
-        name = img_tag["alt"] if img_tag and img_tag.has_attr("alt") else "Unknown"
+TOP_N = 5
 
-        # 숙련도 점수
-        score_tag = r.find("span", class_="mx-auto")
-        score = score_tag.text.strip() if score_tag else "-"
 
-        # 숙련도 레벨(뱃지)
-        level_tag = r.find("span", class_="relative")
-        badge_level = "-"
-        if level_tag:
-            sub = level_tag.find("span", class_="text-2xs leading-none text-white")
-            if sub:
-                badge_level = sub.text.strip()
+def parse_champions(html):
+    champs = []
+    for c in opgg_parse.parse_champs(html, limit=TOP_N):
+        games = c["wins"] + c["losses"]
+        champs.append(dict(c, winrate=f"{int(c['wins'] / games * 100)}%" if games else "-"))
+    return champs
 
-        mastery_list.append({
-            "img": img,
-            "name": name,
-            "score": score,
-            "badge_level": badge_level
-        })
 
-    return mastery_list
+def parse_mastery(html):
+    return opgg_parse.parse_mastery(html, limit=TOP_N)
 
 
 # ----------------------------------------------------
 # 🔵 실행 (챔피언 통계 + 숙련도)
 # ----------------------------------------------------
 with st.spinner("OP.GG에서 데이터를 불러오는 중..."):
-    html_champ = fetch(CHAMPIONS_URL)
-    html_mastery = fetch(MASTERY_URL)
+    html_champ, html_mastery = fetch_all(CHAMPIONS_URL, MASTERY_URL)
 
 
 # -------------------------
@@ -174,7 +139,6 @@ if html_mastery:
         with cols[1]:
             st.subheader(f"{i}. {m['name']}")
             st.write(f"✨ 숙련도 점수: **{m['score']}**")
-            st.write(f"🏆 숙련도 레벨: **{m['badge_level']}**")
 
 
 st.markdown("---")
@@ -1,6 +1,9 @@
 import streamlit as st
-import requests
-import urllib.parse
+from riot_client import get_client
+import riot_api
+import challenge_catalog
+import challenge_table
+from cache_store import get_store
 import pandas as pd
 
 # --- 페이지 설정 ---
@@ -13,6 +16,7 @@ with col_title:
 with col_btn:
     if st.button("🗑️ 데이터 초기화", help="문제가 생기면 누르세요"):
         st.cache_data.clear()
+        get_store().clear()
         st.rerun()
 
 # --- API 키 설정 ---
@@ -27,41 +31,24 @@ if not API_KEY:
     st.stop()
 
 # --- 설정 ---
-REGION_ACCOUNT = "asia"
-REGION_KR = "kr"
-HEADERS = {
-    "X-Riot-Token": API_KEY,
-    "User-Agent": "Mozilla/5.0",
-    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
-}
+riot = get_client(API_KEY)
 
 # --- API 함수 ---
 
-@st.cache_data(ttl=3600)
 def get_puuid(game_name, tag_line):
-    url = f"https://{REGION_ACCOUNT}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{urllib.parse.quote(game_name)}/{urllib.parse.quote(tag_line)}"
     try:
-        res = requests.get(url, headers=HEADERS)
-        return res.json().get('puuid') if res.status_code == 200 else None
+        return riot_api.get_puuid(riot, game_name, tag_line)
     except: return None
 
-@st.cache_data(ttl=3600)
 def get_player_data(puuid):
-    url = f"https://{REGION_KR}.api.riotgames.com/lol/challenges/v1/player-data/{puuid}"
     try:
-        res = requests.get(url, headers=HEADERS)
-        return res.json() if res.status_code == 200 else None
+        return riot_api.get_player_data(riot, puuid)
     except: return None
 
-@st.cache_data(ttl=86400)
+# config는 프로세스 공용 카탈로그(읽기 전용)로 — 다른 페이지/세션과 공유
 def get_all_challenge_config():
-    url = f"https://{REGION_KR}.api.riotgames.com/lol/challenges/v1/challenges/config"
     try:
-        res = requests.get(url, headers=HEADERS)
-        if res.status_code == 200:
-            data = res.json()
-            return {str(item['id']): item for item in data}
-        return None
+        return challenge_catalog.get_catalog(riot)
     except: return None
 
 # --- 실행 로직 ---
@@ -106,42 +93,22 @@ if riot_id:
             
             st.subheader("📜 상세 목록")
             
-            items = []
+            # 열 단위 테이블에서 바로 표 구성 (행마다 dict를 만들지 않음)
+            table = challenge_table.get_table(user_data, config_map)
+            frame = table.frame
+            names = frame["name"].where(frame["challengeId"].isin(list(config_map)), "ID: " + frame["challengeId"].astype(str))
+            # 카테고리(0~5번) 설명
+            descs = frame["desc"].mask(frame["challengeId"] <= 5, "📊 카테고리 합산 점수")
+            items = pd.DataFrame({
+                "도전과제명": names,
+                "등급": frame["level"],
+                "점수": frame["value"],
+                "설명": descs,
+            })
             
-            for challenge in user_data.get('challenges', []):
-                c_id = challenge.get('challengeId')
-                
-                # Config에서 이름 찾기
-                c_info = config_map.get(str(c_id))
-                
-                c_name = f"ID: {c_id}"
-                c_desc = ""
-                
-                if c_info:
-                    names = c_info.get('localizedNames', {})
-                    ko_info = names.get('ko_KR') or names.get('en_US') or {}
-                    c_name = ko_info.get('name', c_name)
-                    c_desc = ko_info.get('description', '')
-
-                # 점수 가져오기
-                final_score = challenge.get('value')
-
-                # 카테고리(0~5번) 설명 추가
-                if c_id <= 5:
-                    c_desc = "📊 카테고리 합산 점수" 
-
-                lvl = challenge.get('level', 'NONE')
-                
-                items.append({
-                    "도전과제명": c_name,
-                    "등급": lvl,
-                    "점수": final_score,
-                    "설명": c_desc
-                })
-            
-            if items:
+            if not items.empty:
                 st.dataframe(
-                    pd.DataFrame(items),
+                    items,
                     column_config={
                         "도전과제명": st.column_config.TextColumn("도전과제명", width="medium"),
                         "등급": st.column_config.TextColumn("등급", width="small"),
@@ -1,6 +1,11 @@
 import streamlit as st
-import requests
-import urllib.parse
+from riot_client import get_client
+import icons
+import challenge_catalog
+import challenge_table
+import card_grid
+import fragment_cache
+import riot_api
 import plotly.graph_objects as go
 import math
 import random
@@ -10,16 +15,8 @@ import time
 st.set_page_config(page_title="롤 도전과제 검색기", page_icon="🏆", layout="wide")
 
 # --- 커스텀 CSS ---
-st.markdown("""
-<style>
-    /* 전체 스타일 */
-    .stApp { background-color: #010a13; color: #c8aa6e; }
-    .block-container { padding-top: 2rem !important; max-width: 1200px; }
-    
-    /* 사이드바 */
-    [data-testid="stSidebar"] { background-color: #091428; border-right: 1px solid #1e282d; }
-    [data-testid="stSidebar"] * { color: #cdbe91 !important; }
-
+# 카드 스타일은 페이지와 카드 그리드 컴포넌트(iframe)에서 함께 사용
+CARD_CSS = """
     /* 기본 카드 스타일 */
     .challenge-card-inner {
         background-color: #1e2328;
@@ -36,6 +33,51 @@ st.markdown("""
         transition: all 0.2s ease;
     }
     
+    /* 칭호 보상 배지 스타일 */
+    .title-reward-badge {
+        position: absolute;
+        top: 10px;
+        right: 10px;
+        background-color: #ffd700;
+        color: #000;
+        font-size: 0.7em;
+        font-weight: bold;
+        padding: 2px 6px;
+        border-radius: 4px;
+        z-index: 5;
+        box-shadow: 0 0 5px rgba(255, 215, 0, 0.5);
+    }
+
+    .card-icon-area { width: 70px; height: 70px; margin-bottom: 10px; flex-shrink: 0; }
+    .card-title {
+        color: #f0e6d2; font-weight: bold; font-size: 1.1em; line-height: 1.3;
+        margin: 5px 0; height: 45px; overflow: hidden;
+        display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;
+    }
+    .card-desc {
+        color: #a09b8c; font-size: 0.8em; line-height: 1.4; margin-bottom: 10px;
+        height: 55px; overflow: hidden;
+        display: -webkit-box; -webkit-line-clamp: 3; -webkit-box-orient: vertical;
+    }
+
+    .card-footer { margin-top: auto; width: 100%; }
+
+    .card-detail {
+        margin-top: 8px; padding: 4px 0; width: 100%;
+        border: 1px solid #c8aa6e; border-radius: 4px; color: #c8aa6e; font-size: 0.85em;
+    }
+    .grid-card:hover .card-detail { background-color: #c8aa6e; color: #010a13; }
+"""
+
+st.markdown("<style>" + CARD_CSS + """
+    /* 전체 스타일 */
+    .stApp { background-color: #010a13; color: #c8aa6e; }
+    .block-container { padding-top: 2rem !important; max-width: 1200px; }
+    
+    /* 사이드바 */
+    [data-testid="stSidebar"] { background-color: #091428; border-right: 1px solid #1e282d; }
+    [data-testid="stSidebar"] * { color: #cdbe91 !important; }
+
     /* 승급 임박 카드 강조 스타일 */
     .imminent-card {
         border: 2px solid #d13639 !important;
@@ -52,21 +94,6 @@ st.markdown("""
         margin-bottom: 5px;
     }
 
-    /* 칭호 보상 배지 스타일 */
-    .title-reward-badge {
-        position: absolute;
-        top: 10px;
-        right: 10px;
-        background-color: #ffd700;
-        color: #000;
-        font-size: 0.7em;
-        font-weight: bold;
-        padding: 2px 6px;
-        border-radius: 4px;
-        z-index: 5;
-        box-shadow: 0 0 5px rgba(255, 215, 0, 0.5);
-    }
-
     /* 랜덤 추첨 카드 스타일 */
     .spinning-card-container {
         display: flex;
@@ -85,24 +112,10 @@ st.markdown("""
         z-index: 10; 
     }
     
-    .card-icon-area { width: 70px; height: 70px; margin-bottom: 10px; flex-shrink: 0; }
     .spinning-card .card-icon-area { width: 100px; height: 100px; }
 
-    .card-title {
-        color: #f0e6d2; font-weight: bold; font-size: 1.1em; line-height: 1.3;
-        margin: 5px 0; height: 45px; overflow: hidden;
-        display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;
-    }
     .spinning-card .card-title { font-size: 1.4em; height: auto; -webkit-line-clamp: 3; }
 
-    .card-desc {
-        color: #a09b8c; font-size: 0.8em; line-height: 1.4; margin-bottom: 10px;
-        height: 55px; overflow: hidden;
-        display: -webkit-box; -webkit-line-clamp: 3; -webkit-box-orient: vertical;
-    }
-
-    .card-footer { margin-top: auto; width: 100%; }
-
     /* 모달 및 기타 */
     .modal-stat-box { background-color: #1a1c21; padding: 15px; border-radius: 10px; margin-top: 10px; border: 1px solid #333; }
     
@@ -123,13 +136,7 @@ if not API_KEY:
     st.warning("⚠️ 코드 내 `API_KEY` 변수에 라이엇 API 키를 입력해주세요.")
     st.stop()
 
-REGION_ACCOUNT = "asia"
-REGION_KR = "kr"
-HEADERS = {
-    "X-Riot-Token": API_KEY,
-    "User-Agent": "Mozilla/5.0",
-    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
-}
+riot = get_client(API_KEY)
 
 # --- Helper Functions ---
 def get_tier_color(tier):
@@ -140,69 +147,25 @@ def get_tier_color(tier):
     }
     return colors.get(tier, '#3c3c44')
 
-def calculate_next_level(challenge_info, config_info):
-    current_val = challenge_info.get('value', 0)
-    current_level = challenge_info.get('level', 'NONE')
-    thresholds = config_info.get('thresholds', {})
-    
-    order = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
-    
-    next_tier = "MAX"
-    next_threshold = current_val
-    prev_threshold = 0
-    
-    try:
-        curr_idx = order.index(current_level)
-        if curr_idx < len(order) - 1:
-            next_tier = order[curr_idx + 1]
-            next_threshold = thresholds.get(next_tier, current_val)
-            prev_threshold = thresholds.get(current_level, 0)
-        else:
-            next_tier = "MAX"
-            next_threshold = current_val
-            prev_threshold = thresholds.get('GRANDMASTER', 0)
-    except ValueError:
-        next_tier = 'IRON'
-        next_threshold = thresholds.get('IRON', 0)
-        prev_threshold = 0
-
-    return next_tier, prev_threshold, next_threshold
-
 def has_title_reward(config_item):
-    thresholds = config_item.get('thresholds', {})
-    for tier, val in thresholds.items():
-        if isinstance(val, dict) and 'rewards' in val:
-            for reward in val['rewards']:
-                if reward.get('type') == 'TITLE':
-                    return True
-    return False
+    # 칭호 보상 여부는 카탈로그를 만들 때 미리 계산해 둠
+    return config_item.has_title
 
 # --- API Functions ---
-@st.cache_data(ttl=3600)
 def get_puuid(game_name, tag_line):
-    url = f"https://{REGION_ACCOUNT}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{urllib.parse.quote(game_name)}/{urllib.parse.quote(tag_line)}"
     try:
-        res = requests.get(url, headers=HEADERS)
-        return res.json().get('puuid') if res.status_code == 200 else None
+        return riot_api.get_puuid(riot, game_name, tag_line)
     except: return None
 
-@st.cache_data(ttl=3600)
 def get_player_data(puuid):
-    url = f"https://{REGION_KR}.api.riotgames.com/lol/challenges/v1/player-data/{puuid}"
     try:
-        res = requests.get(url, headers=HEADERS)
-        return res.json() if res.status_code == 200 else None
+        return riot_api.get_player_data(riot, puuid)
     except: return None
 
-@st.cache_data(ttl=86400)
+# config는 프로세스 공용 카탈로그(읽기 전용)로 — 세션마다 복사해 두지 않음
 def get_all_challenge_config():
-    url = f"https://{REGION_KR}.api.riotgames.com/lol/challenges/v1/challenges/config"
     try:
-        res = requests.get(url, headers=HEADERS)
-        if res.status_code == 200:
-            data = res.json()
-            return {str(item['id']): item for item in data}
-        return None
+        return challenge_catalog.get_catalog(riot)
     except: return None
 
 def make_donut(val, max_val, tier):
@@ -225,19 +188,21 @@ def make_donut(val, max_val, tier):
 
 # --- 상세 정보 팝업 (모달) ---
 @st.dialog("도전과제 상세 정보")
-def show_detail_modal(challenge_data, config_data):
+def show_detail_modal(table, cid):
+    i = table.position(cid)
+    challenge_data = table.records[i]
+    config_data = conf.get(cid)
     c_id = str(challenge_data.get('challengeId'))
     current_val = challenge_data.get('value', 0)
     level = challenge_data.get('level', 'NONE')
     percentile = challenge_data.get('percentile', 0) * 100 
 
-    names = config_data.get('localizedNames', {})
-    ko = names.get('ko_KR') or names.get('en_US') or {}
-    c_name = ko.get('name', f"Unknown ({c_id})")
-    c_desc = ko.get('description', '설명 없음').replace("<br>", " ")
+    c_name = config_data.name or f"Unknown ({c_id})"
+    c_desc = (config_data.description or '설명 없음').replace("<br>", " ")
     
     color = get_tier_color(level)
-    icon_url = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c_id}/tokens/{level.lower()}.png"
+    # 로컬 아이콘 캐시에 있으면 파일 경로, 없으면 원격 URL
+    icon_url = icons.token_path(c_id, level) or icons.token_url(c_id, level)
 
     col1, col2 = st.columns([1, 3])
     with col1:
@@ -250,20 +215,24 @@ def show_detail_modal(challenge_data, config_data):
     
     st.divider()
     st.info(c_desc)
-
-    next_tier, prev_th, next_th = calculate_next_level(challenge_data, config_data)
+    # 보상 / 상위 도전과제는 카탈로그의 보상 색인에서 바로 조회
+    if config_data.title_tier:
+        st.caption(f"👑 {config_data.title_tier} 달성 시 칭호 획득")
+    if config_data.parent is not None and conf is not None:
+        st.caption(f"📂 상위 도전과제: {conf.get(config_data.parent).name or config_data.parent}")
+
+    # 다음 티어 / 기준 점수 / 진행률은 테이블에서 미리 계산한 값
+    next_tier, prev_th, next_th, ratio = table.step(i)
     
     if next_tier == "MAX":
         st.balloons()
         st.success("🏆 모든 단계를 완료했습니다!")
         st.metric(label="현재 점수", value=f"{current_val:,.0f} Pts")
     else:
-        range_val = next_th - prev_th
-        current_progress = current_val - prev_th
-        if range_val <= 0: range_val = 1 
-        ratio = min(max(current_progress / range_val, 0.0), 1.0) 
-        
         st.markdown(f"#### 다음 단계: <span style='color:{get_tier_color(next_tier)}'>{next_tier}</span>", unsafe_allow_html=True)
+        next_rewards = config_data.rewards_at(next_tier)
+        if next_rewards:
+            st.caption(f"🎁 {next_tier} 달성 보상: {', '.join(next_rewards)}")
         msg = f"목표까지 {next_th - current_val:,.0f} 남음"
 
         st.markdown(f"""
@@ -280,13 +249,17 @@ def show_detail_modal(challenge_data, config_data):
         """, unsafe_allow_html=True)
 
 # --- Main Logic ---
-if 'config' not in st.session_state:
-    st.session_state.config = get_all_challenge_config()
 if 'page_num' not in st.session_state:
     st.session_state.page_num = 1
 if 'search_query' not in st.session_state:
     st.session_state.search_query = ""
 
+# 검색창 변경 콜백 — 입력이 확정될 때(Enter/포커스 이동) 한 번만 반영, 추가 st.rerun() 없음
+def on_search_change():
+    st.session_state.search_query = st.session_state.search_box
+    st.session_state.page_num = 1
+
+
 with st.sidebar:
     st.title("LoL Challenges")
     riot_id = st.text_input("Riot ID (이름#태그)", value="hide on bush#KR1")
@@ -310,11 +283,14 @@ with st.sidebar:
     
     st.markdown("---")
     show_imminent = st.checkbox("🔥 승급 임박 추천 보기", value=False)
-    # [수정] 칭호 필터링 체크박스 삭제됨
+    # 보상 필터 (카탈로그 보상 색인 → 테이블 마스크)
+    title_only = st.checkbox("👑 칭호 보상 있는 것만", value=False)
+    next_reward_only = st.checkbox("🎁 다음 티어 보상 있는 것만", value=False)
 
-if st.session_state.get('data') and st.session_state.get('config'):
+conf = get_all_challenge_config()
+
+if st.session_state.get('data') and conf:
     data = st.session_state.data
-    conf = st.session_state.config
     
     total = data.get('totalPoints', {})
     cur = total.get('current', 0)
@@ -342,25 +318,21 @@ if st.session_state.get('data') and st.session_state.get('config'):
     st.markdown("---")
 
     # 데이터 준비
-    challenges = sorted(data.get('challenges', []), key=lambda x: x['value'], reverse=True)
-    real_challenges = [c for c in challenges if c['challengeId'] > 10]
+    # 플레이어별 열 단위 테이블 (한 번 만들고 재사용) — 기본 순서는 점수 높은 순
+    table = challenge_table.get_table(data, conf)
+    real_pos = table.ordered("점수 높은 순", min_id=10)
+    real_challenges = table.rows(real_pos)
+    # 플레이어의 모든 아이콘을 백그라운드로 미리 받아둠
+    icons.prefetch([(c['challengeId'], c.get('level', 'NONE')) for c in real_challenges])
 
     # [UI] 승급 임박 표시 로직 (체크박스 활성화 시)
     if show_imminent:
-        imminent_list = []
-        for c in real_challenges:
-            c_id = str(c['challengeId'])
-            cfg = conf.get(c_id, {})
-            next_tier, _, next_th = calculate_next_level(c, cfg)
-            
-            if next_tier != "MAX" and c['value'] < next_th:
-                diff = next_th - c['value']
-                imminent_list.append({
-                    'diff': diff, 'data': c, 'config': cfg, 'next_tier': next_tier
-                })
-        
-        imminent_list.sort(key=lambda x: x['diff'])
-        top_imminent = imminent_list[:5]
+        # 다음 티어까지 남은 점수는 테이블에서 한 번에 계산, 가장 가까운 5개만 부분 선택
+        top_imminent = [
+            {'diff': table.diff(i), 'data': table.records[i],
+             'config': conf.get(table.ids[i]), 'next_tier': table.next_tier(i)}
+            for i in table.nearest(real_pos, 5)
+        ]
 
         if top_imminent:
             st.markdown("### 🔥 승급까지 한 걸음! (승급 임박 TOP 5)")
@@ -371,21 +343,19 @@ if st.session_state.get('data') and st.session_state.get('config'):
                 diff = item['diff']
                 next_tier = item['next_tier']
                 
-                names = c_conf.get('localizedNames', {})
-                ko = names.get('ko_KR') or names.get('en_US') or {}
-                c_name = ko.get('name', 'Unknown')
-                c_desc = ko.get('description', '')[:30] + "..." if len(ko.get('description', '')) > 30 else ko.get('description', '')
+                c_name = c_conf.name or 'Unknown'
+                full_desc = c_conf.description or ''
+                c_desc = full_desc[:30] + "..." if len(full_desc) > 30 else full_desc
                 
                 curr_level = c_data.get('level', 'NONE')
                 color = get_tier_color(curr_level)
-                icon_url = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c_data.get('challengeId')}/tokens/{curr_level.lower()}.png"
 
                 with i_cols[idx]:
                     card_html = (
                         f'<div class="challenge-card-inner imminent-card" style="height: 280px; margin-bottom: 10px;">'
                         f'  <div class="imminent-badge">D-{diff:,.0f}점</div>'
                         f'  <div class="card-icon-area" style="width:50px; height:50px; background:#121212; border-radius:50%; display:flex; justify-content:center; align-items:center;">'
-                        f'    <img src="{icon_url}" style="width:100%; height:100%; object-fit:contain;" onerror="this.style.display=\'none\';">'
+                        f'    {icons.icon_html(c_data.get("challengeId"), curr_level, 50)}'
                         f'  </div>'
                         f'  <div class="card-title" style="font-size:1em; height:40px;">{c_name}</div>'
                         f'  <div class="card-desc" style="font-size:0.75em; height:40px;">{c_desc}</div>'
@@ -396,7 +366,7 @@ if st.session_state.get('data') and st.session_state.get('config'):
                     )
                     st.markdown(card_html, unsafe_allow_html=True)
                     if st.button("상세", key=f"btn_imm_{c_data.get('challengeId')}", use_container_width=True):
-                        show_detail_modal(c_data, c_conf)
+                        show_detail_modal(table, c_data['challengeId'])
             st.divider()
 
     # 애니메이션 공간
@@ -405,7 +375,8 @@ if st.session_state.get('data') and st.session_state.get('config'):
     # 검색창 + 랜덤 추천
     col_search, col_rand = st.columns([3, 1], vertical_alignment="bottom")
     with col_search:
-        search_input = st.text_input("🔍 도전과제 검색 (이름, 내용)", placeholder="예: 무작위 총력전, 펜타킬...", value=st.session_state.search_query)
+        st.text_input("🔍 도전과제 검색 (이름, 내용)", placeholder="예: 무작위 총력전, 펜타킬...", value=st.session_state.search_query,
+                      key="search_box", on_change=on_search_change)
 
     with col_rand:
         if st.button("🎲 오늘의 도전과제", use_container_width=True, type="primary"):
@@ -413,13 +384,10 @@ if st.session_state.get('data') and st.session_state.get('config'):
                 for i in range(15):
                     temp_pick = random.choice(real_challenges)
                     c_id_temp = str(temp_pick['challengeId'])
-                    config_temp = conf.get(c_id_temp, {})
-                    names_temp = config_temp.get('localizedNames', {})
-                    ko_temp = names_temp.get('ko_KR') or names_temp.get('en_US') or {}
-                    c_name_temp = ko_temp.get('name', "Unknown")
+                    c_name_temp = conf.get(c_id_temp).name or "Unknown"
                     level_temp = temp_pick.get('level', 'NONE')
                     color_temp = get_tier_color(level_temp)
-                    icon_url_temp = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c_id_temp}/tokens/{level_temp.lower()}.png"
+                    icon_url_temp = icons.token_url(c_id_temp, level_temp)
 
                     temp_html = (
                         f'<div class="spinning-card-container">'
@@ -438,52 +406,19 @@ if st.session_state.get('data') and st.session_state.get('config'):
 
                 spin_placeholder.empty()
                 random_pick = random.choice(real_challenges)
-                pick_config = conf.get(str(random_pick['challengeId']), {})
-                show_detail_modal(random_pick, pick_config)
+                show_detail_modal(table, random_pick['challengeId'])
             else:
                 st.toast("추천할 도전과제가 없습니다.")
 
     # 검색 및 필터링 로직 (탭 & 칭호 & 검색)
-    if search_input != st.session_state.search_query:
-        st.session_state.search_query = search_input
-        st.session_state.page_num = 1
-        st.rerun()
-
-    filtered_challenges = []
-    
-    query = search_input.lower().strip() if search_input.strip() else ""
-
-    for c in real_challenges:
-        c_id = str(c['challengeId'])
-        config_item = conf.get(c_id, {})
-        
-        # [수정] 칭호 필터링 삭제됨 (조건문 제거)
-
-        # 필터 2: 검색어
-        names = config_item.get('localizedNames', {})
-        ko = names.get('ko_KR') or names.get('en_US') or {}
-        c_name = ko.get('name', '').lower()
-        c_desc = ko.get('description', '').lower()
-        
-        if query and (query not in c_name and query not in c_desc):
-            continue
-            
-        filtered_challenges.append(c)
-
-    # [신규] 정렬 로직 적용
-    # 티어 순서 정의 (낮은 순 -> 높은 순)
-    tier_order_list = ['NONE', 'IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
-    
-    if sort_option == "점수 높은 순":
-        filtered_challenges.sort(key=lambda x: x.get('value', 0), reverse=True)
-    elif sort_option == "점수 낮은 순":
-        filtered_challenges.sort(key=lambda x: x.get('value', 0))
-    elif sort_option == "티어 높은 순":
-        filtered_challenges.sort(key=lambda x: tier_order_list.index(x.get('level', 'NONE')), reverse=True)
-    elif sort_option == "티어 낮은 순":
-        filtered_challenges.sort(key=lambda x: tier_order_list.index(x.get('level', 'NONE')))
-
-    if not filtered_challenges:
+    # 필터: 검색어 (설정 버전별 검색 인덱스 — 이름/설명 부분 문자열, 초성)
+    # 이전 검색어를 이어 입력한 경우 ('펜' → '펜타') 이전 결과 안에서만 검색
+    # [신규] 정렬 로직 적용 (미리 계산한 정렬 순열에서 검색 결과만 골라냄 — 정렬 없음)
+    matched = conf.index.refine(st.session_state.search_query, st.session_state.setdefault("search_refine", {}))
+    filtered_challenges = table.ordered(sort_option, min_id=10, ids=matched,
+                                        title_only=title_only, next_reward=next_reward_only)
+
+    if len(filtered_challenges) == 0:
         st.warning(f"조건에 맞는 도전과제가 없습니다.")
     else:
         ITEMS_PER_PAGE = 20
@@ -509,49 +444,58 @@ if st.session_state.get('data') and st.session_state.get('config'):
 
         start_idx = (st.session_state.page_num - 1) * ITEMS_PER_PAGE
         end_idx = start_idx + ITEMS_PER_PAGE
-        current_page_data = filtered_challenges[start_idx:end_idx]
-
-        cols = st.columns(4)
-        
-        for i, challenge in enumerate(current_page_data):
-            c_id = str(challenge.get('challengeId'))
-            config_item = conf.get(c_id, {})
+        current_page_data = table.rows(filtered_challenges[start_idx:end_idx])
+
+        # 페이지 아이콘이 모두 로컬에 있으면 스프라이트 1장으로 표시
+        sprite = icons.page_sprite([(c.get('challengeId'), c.get('level', 'NONE')) for c in current_page_data])
+        # 카드 20장을 컴포넌트 하나로 렌더링, 눌린 카드의 상세 정보를 모달로
+        def build_cards():
+            cards = []
+            for challenge in current_page_data:
+                c_id = str(challenge.get('challengeId'))
+                config_item = conf.get(c_id)
             
-            points = challenge.get('value', 0)
-            level = challenge.get('level', 'NONE')
+                points = challenge.get('value', 0)
+                level = challenge.get('level', 'NONE')
             
-            names = config_item.get('localizedNames', {})
-            ko = names.get('ko_KR') or names.get('en_US') or {}
-            c_name = ko.get('name', f"Unknown")
-            c_desc = ko.get('description', '설명 없음')
+                c_name = config_item.name or "Unknown"
+                c_desc = config_item.description or '설명 없음'
             
-            color = get_tier_color(level)
-            icon_url = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c_id}/tokens/{level.lower()}.png"
+                color = get_tier_color(level)
 
-            title_badge_html = ""
-            if has_title_reward(config_item):
-                title_badge_html = '<div class="title-reward-badge">👑 TITLE</div>'
+                title_badge_html = ""
+                if has_title_reward(config_item):
+                    title_badge_html = '<div class="title-reward-badge">👑 TITLE</div>'
 
-            with cols[i % 4]:
                 # [수정] 한 줄 연결 방식 (들여쓰기 오류 방지)
                 card_html = (
                     f'<div class="challenge-card-inner" style="border-bottom: 4px solid {color}; margin-bottom: 5px;">'
                     f'  {title_badge_html}'
                     f'  <div class="card-icon-area" style="background:#121212; border-radius:50%; display:flex; justify-content:center; align-items:center;">'
-                    f'    <img src="{icon_url}" style="width:100%; height:100%; object-fit:contain;" onerror="this.style.display=\'none\';">'
+                    f'    {icons.icon_html(c_id, level, 70, sprite=sprite)}'
                     f'  </div>'
                     f'  <div class="card-title">{c_name}</div>'
                     f'  <div class="card-desc">{c_desc}</div>'
                     f'  <div class="card-footer">'
                     f'    <div style="color:{color}; font-weight:bold; font-size:1.1em;">{points:,.0f} Pts</div>'
                     f'    <div style="color:{color}; font-size:0.9em;">{level}</div>'
+                    f'    <div class="card-detail">상세 정보</div>'
                     f'  </div>'
                     f'</div>'
                 )
-                st.markdown(card_html, unsafe_allow_html=True)
-                
-                if st.button("상세 정보", key=f"btn_{c_id}", use_container_width=True):
-                    show_detail_modal(challenge, config_item)
+                cards.append(card_grid.card(c_id, card_html))
+            return tuple(cards)
+
+        # 같은 데이터/페이지/정렬/검색어/필터면 이전에 만든 마크업 재사용
+        cards = fragment_cache.render("as/challenge-cards", (table.key, st.session_state.page_num, sort_option, st.session_state.search_query,
+                                                          title_only, next_reward_only, challenge_catalog.LOCALE, sprite is not None, icons.generation()),
+                                      build_cards)
+
+        clicked = card_grid.card_grid(cards, css=CARD_CSS, columns=4, key="challenge_grid")
+        if clicked is not None:
+            picked = next((c for c in current_page_data if str(c.get('challengeId')) == clicked), None)
+            if picked is not None:
+                show_detail_modal(table, picked['challengeId'])
 
         st.markdown("<br><br>", unsafe_allow_html=True)
 
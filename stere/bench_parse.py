@@ -0,0 +1,80 @@
+import argparse
+import os
+import time
+
+# 순수 파싱 시간만 재도록 프로세스 풀 없이 현재 스레드에서 파싱
+os.environ.setdefault("LOL_PARSE_WORKERS", "0")
+
+import opgg_parse  # noqa: E402
+from http_record import load_fixtures  # noqa: E402
+
+# -------------------------------------------------
+# OP.GG 파서 백엔드 벤치마크
+#  - 입력: 저장해 둔 HTML 파일, 녹화 폴더(LOL_HTTP_RECORD_DIR), 또는 --name/--tag 로 실시간 요청
+#  - 백엔드마다 페이지당 파싱 시간(ms)을 재고, bs4 결과와 같은지 함께 확인
+#  - payload 열: DOM 없이 내장 JSON만 디코딩한 경우 (페이로드가 없으면 "-")
+#   예) python bench_parse.py --fixtures fixtures
+#       python bench_parse.py --name "Hide on bush" --tag KR1 --repeat 20
+# -------------------------------------------------
+
+
+def page_kind(name):
+    return "mastery" if "mastery" in name else "champions"
+
+
+def load_pages(args):
+    """[(이름, 종류, HTML 바이트)]"""
+    pages = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), page_kind(path), f.read()))
+    if args.fixtures:
+        for (_, url), fx in load_fixtures(args.fixtures).items():
+            if "op.gg" in url and fx["status"] == 200:
+                pages.append((url.rsplit("/", 2)[-2] + "/" + url.rsplit("/", 1)[-1], page_kind(url), fx["body"]))
+    if args.name and args.tag:
+        from opgg_client import fetch_pages
+        for kind, body in zip(("champions", "mastery"), fetch_pages(args.name, args.tag)):
+            if body:
+                pages.append((f"{args.name}#{args.tag}/{kind}", kind, body))
+    return pages
+
+
+def bench(parse, html, repeat):
+    parse(html)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = parse(html)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OP.GG HTML 파서 백엔드 벤치마크")
+    parser.add_argument("files", nargs="*", help="HTML 파일 (이름에 mastery 가 있으면 숙련도 페이지)")
+    parser.add_argument("--fixtures", help="LOL_HTTP_RECORD_DIR 로 녹화한 폴더")
+    parser.add_argument("--name")
+    parser.add_argument("--tag")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        parser.error("파싱할 페이지가 없습니다")
+
+    backends = opgg_parse.available_backends()
+    print(f"{'page':40} {'kind':10} {'bytes':>9} " + " ".join(f"{b:>12}" for b in backends + ["payload"]))
+    for name, kind, html in pages:
+        parse = opgg_parse.parse_mastery if kind == "mastery" else opgg_parse.parse_champs
+        _, expected = bench(lambda h: parse(h, backend="bs4", mode="dom", use_cache=False), html, 1)
+        cells = []
+        for b in backends:
+            ms, result = bench(lambda h: parse(h, backend=b, mode="dom", use_cache=False), html, args.repeat)
+            cells.append(f"{ms:9.2f}ms{'' if result == expected else '≠'}")
+        ms, result = bench(lambda h: parse(h, mode="payload", use_cache=False), html, args.repeat)
+        cells.append(f"{ms:9.2f}ms" if result else "-")
+        print(f"{name[:40]:40} {kind:10} {len(html):>9} " + " ".join(f"{c:>12}" for c in cells))
+    print("≠ : bs4 기준 결과와 다름")
+
+
+if __name__ == "__main__":
+    main()
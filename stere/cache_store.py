@@ -0,0 +1,394 @@
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from singleflight import get_group
+
+# -------------------------------------------------
+# 교체 가능한 캐시 저장소
+#  - memory : 프로세스 내 LRU (기본값)
+#  - sqlite : 디스크 저장 + TTL, 재시작/배포 후에도 유지, 같은 머신의 워커끼리 공유
+#  - redis  : redis 호환 클라이언트 (테스트 시 fakeredis 등으로 대체 가능)
+# 환경 변수
+#  LOL_CACHE_BACKEND = memory | sqlite | redis
+#  LOL_CACHE_PATH    = sqlite 파일 경로
+#  LOL_CACHE_REDIS_URL = redis://localhost:6379/0
+#  LOL_CACHE_MAX_MB      = 메모리 캐시 예산 (MB, 기본 256). 넘으면 오래 안 쓴 항목부터 제거
+#  LOL_CACHE_MAX_ENTRIES = 메모리 캐시 최대 항목 수 (기본 2048)
+# -------------------------------------------------
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "cache.sqlite3")
+KEY_PREFIX = "lol:"
+MAX_BYTES = int(float(os.environ.get("LOL_CACHE_MAX_MB", "256")) * 1024 * 1024)
+MAX_ENTRIES = int(os.environ.get("LOL_CACHE_MAX_ENTRIES", "2048"))
+
+
+class CacheStore:
+    """값은 (value, expires_at) 형태로 저장. expires_at=None 이면 만료 없음"""
+
+    def get_entry(self, key):
+        raise NotImplementedError
+
+    def set_entry(self, key, value, expires_at):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value, ttl=None):
+        self.set_entry(key, value, time.time() + ttl if ttl else None)
+
+
+def _expired(expires_at):
+    return expires_at is not None and expires_at <= time.time()
+
+
+def estimate_size(value):
+    """값이 차지하는 대략적인 메모리 (바이트)
+    - dict / list / tuple / set 은 안쪽까지 합산 (같은 객체는 한 번만)
+    - 그 외 객체는 nbytes 속성(numpy 배열, ChallengeTable 등)이 있으면 그 값, 없으면 sys.getsizeof
+    """
+    total = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            total += sys.getsizeof(obj)
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(obj)
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, bytearray)):
+            total += sys.getsizeof(obj)
+        else:
+            nbytes = getattr(obj, "nbytes", None)
+            total += nbytes if isinstance(nbytes, int) else sys.getsizeof(obj)
+    return total
+
+
+def _namespace(key):
+    """'player-data:ab12..' → 'player-data' (cached()/revalidate 키 형식)"""
+    return key.split(":", 1)[0] if isinstance(key, str) else None
+
+
+_lrus = {}
+_lrus_lock = threading.Lock()
+
+
+class MemoryLRU(CacheStore):
+    """프로세스 내 LRU. max_entries 와 max_bytes(바이트 예산) 중 먼저 넘는 쪽 기준으로 오래된 항목 제거
+    - name 을 주면 get_stats() 에 이름별로 집계 (키 앞부분 'namespace:' 별 항목 수/크기/제거 수 포함)
+    """
+
+    def __init__(self, max_entries=512, max_bytes=None, name=None, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.evictions = 0
+        self.rejected = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._ns = {}
+        self._lock = threading.Lock()
+        if name:
+            with _lrus_lock:
+                _lrus[name] = self
+
+    def _ns_stats(self, key):
+        ns = _namespace(key) or self.name or "default"
+        stats = self._ns.get(ns)
+        if stats is None:
+            stats = self._ns[ns] = {"entries": 0, "bytes": 0, "evictions": 0}
+        return stats
+
+    def _remove(self, key, evicted=False):
+        # 호출 측에서 lock 보유
+        del self._data[key]
+        size = self._sizes.pop(key, 0)
+        self.bytes -= size
+        stats = self._ns_stats(key)
+        stats["entries"] -= 1
+        stats["bytes"] -= size
+        if evicted:
+            stats["evictions"] += 1
+            self.evictions += 1
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if _expired(entry[1]):
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set_entry(self, key, value, expires_at):
+        # 크기 계산은 lock 밖에서 (큰 페이로드도 다른 스레드를 막지 않도록)
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejected += 1  # 예산보다 큰 값은 저장하지 않음
+                return
+            self._data[key] = (value, expires_at)
+            self._sizes[key] = size
+            self.bytes += size
+            stats = self._ns_stats(key)
+            stats["entries"] += 1
+            stats["bytes"] += size
+            while len(self._data) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._remove(next(iter(self._data)), evicted=True)
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._ns.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "namespaces": {ns: dict(v) for ns, v in self._ns.items() if v["entries"] or v["evictions"]},
+            }
+
+
+class SQLiteStore(CacheStore):
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+
+    def _conn(self):
+        # sqlite 커넥션은 스레드별로 하나씩 (WAL 모드로 여러 프로세스가 동시에 읽기 가능)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if _expired(row[1]):
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ? AND expires = ?", (key, row[1]))
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def set_entry(self, key, value, expires_at):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                         (key, sqlite3.Binary(blob), expires_at))
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class RedisStore(CacheStore):
+    def __init__(self, client=None, url=None):
+        if client is None:
+            import redis  # 선택 의존성: redis 백엔드를 쓸 때만 필요
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+
+    def get_entry(self, key):
+        blob = self.client.get(KEY_PREFIX + key)
+        if blob is None:
+            return None
+        value, expires_at = pickle.loads(blob)
+        return None if _expired(expires_at) else (value, expires_at)
+
+    def set_entry(self, key, value, expires_at):
+        blob = pickle.dumps((value, expires_at), protocol=pickle.HIGHEST_PROTOCOL)
+        if expires_at is None:
+            self.client.set(KEY_PREFIX + key, blob)
+        else:
+            self.client.set(KEY_PREFIX + key, blob, px=max(1, int((expires_at - time.time()) * 1000)))
+
+    def delete(self, key):
+        self.client.delete(KEY_PREFIX + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=KEY_PREFIX + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class TieredStore(CacheStore):
+    """메모리(front) → 영구 저장소(back) 순서로 조회. back 적중 시 같은 만료 시각으로 front 채움"""
+
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+
+    def get_entry(self, key):
+        entry = self.front.get_entry(key)
+        if entry is None:
+            entry = self.back.get_entry(key)
+            if entry is not None:
+                self.front.set_entry(key, *entry)
+        return entry
+
+    def set_entry(self, key, value, expires_at):
+        self.front.set_entry(key, value, expires_at)
+        self.back.set_entry(key, value, expires_at)
+
+    def delete(self, key):
+        self.front.delete(key)
+        self.back.delete(key)
+
+    def clear(self):
+        self.front.clear()
+        self.back.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _memory_store():
+    return MemoryLRU(max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, name="store")
+
+
+def create_store(backend=None):
+    backend = (backend or os.environ.get("LOL_CACHE_BACKEND", "memory")).lower()
+    if backend == "sqlite":
+        return TieredStore(_memory_store(), SQLiteStore(os.environ.get("LOL_CACHE_PATH", DEFAULT_PATH)))
+    if backend == "redis":
+        return TieredStore(_memory_store(), RedisStore(url=os.environ.get("LOL_CACHE_REDIS_URL")))
+    return _memory_store()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_store()
+        return _store
+
+
+def set_store(store):
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def get_stats():
+    """이름 붙은 메모리 캐시별 항목 수 / 바이트 / 제거 수"""
+    with _lrus_lock:
+        lrus = list(_lrus.items())
+    return {name: lru.stats() for name, lru in lrus}
+
+
+def make_key(namespace, parts):
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def peek(namespace, parts):
+    """cached() 로 저장된 값 (만료 여부 무관, 없으면 None). 갱신/single-flight 없음"""
+    entry = get_store().get_entry(make_key(namespace, parts))
+    return entry[0][0] if entry is not None else None
+
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _refresh_in_background(k, load):
+    with _refreshing_lock:
+        if k in _refreshing:
+            return
+        _refreshing.add(k)
+
+    def run():
+        try:
+            load()
+        except Exception:
+            pass  # 실패하면 기존(오래된) 값을 계속 사용
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(k)
+
+    _refresh_pool.submit(run)
+
+
+def cached(namespace, ttl, key=None, cache_if=None, stale_ttl=None, refresh_ahead=0.1):
+    """fetch 함수용 데코레이터 (stale-while-revalidate)
+    - key(*args)로 캐시 키 구성, cache_if(value)가 참일 때만 저장
+    - TTL이 지난 값도 stale_ttl(기본 ttl) 동안은 바로 돌려주고 백그라운드에서 갱신
+    - 만료 직전(ttl * refresh_ahead 이내)에 조회된 키는 미리 갱신
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parts = key(*args, **kwargs) if key else (args, sorted(kwargs.items()))
+            k = make_key(namespace, parts)
+            store = get_store()
+
+            def load():
+                value = fn(*args, **kwargs)
+                if (cache_if(value) if cache_if else value is not None):
+                    store.set(k, (value, time.time() + ttl), ttl + stale_ttl)
+                return value
+
+            entry = store.get_entry(k)
+            if entry is not None:
+                value, fresh_until = entry[0]
+                if time.time() >= fresh_until - ttl * refresh_ahead:
+                    _refresh_in_background(k, lambda: get_group("cache").do(k, load))
+                return value
+
+            # 같은 키로 동시에 캐시를 놓친 요청은 한 번만 실행하고 결과 공유
+            return get_group("cache").do(k, load)
+        return wrapper
+    return deco
@@ -0,0 +1,32 @@
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# -------------------------------------------------
+# 도전과제 카드 그리드 (한 페이지 = 컴포넌트 1개)
+#  - 카드 20장을 HTML 문자열 하나로 보내 한 번에 렌더링 (카드별 st.markdown + st.button 없음)
+#  - 카드를 누르면 {'id', 'nonce'} 를 돌려줌 → 새 클릭일 때만 id 반환 (rerun 마다 모달이 다시 열리지 않게)
+#  - 프런트엔드는 빌드 없는 정적 index.html (Streamlit 컴포넌트 postMessage 규약을 직접 구현)
+#  - 아이콘의 app/static/... 상대 경로는 iframe 안에서도 앱 루트 기준으로 풀리도록 <base> 지정
+# -------------------------------------------------
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "card_grid_frontend")
+
+_component = components.declare_component("card_grid", path=FRONTEND_DIR)
+
+
+def card(cid, html):
+    """클릭 대상 카드 한 장 (data-cid 로 어떤 카드인지 구분)"""
+    return f'<div class="grid-card" data-cid="{cid}">{html}</div>'
+
+
+def card_grid(cards, css="", columns=4, key="card_grid"):
+    """card() 로 만든 카드들을 한 번에 렌더링. 이번 실행에서 새로 클릭된 카드 id (없으면 None)"""
+    event = _component(html="".join(cards), css=css, columns=columns, key=key, default=None)
+    if not event:
+        return None
+    seen = f"_{key}_nonce"
+    if st.session_state.get(seen) == event.get("nonce"):
+        return None
+    st.session_state[seen] = event.get("nonce")
+    return event.get("id")
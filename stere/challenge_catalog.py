@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+import riot_api
+from challenge_index import ChallengeIndex, config_version
+from challenge_table import TIER_ORDER
+
+# -------------------------------------------------
+# 도전과제 카탈로그 (프로세스 전체에서 하나를 공유, 읽기 전용)
+#  - 원본 config 에서 화면이 쓰는 필드만 남김: 현재 언어의 이름/설명, 기준 점수, 보상
+#  - 보상 색인: (티어, 보상 종류) 목록과 칭호를 주는 첫 티어, config 의 parentId(상위 도전과제)
+#  - 항목은 __slots__ 객체, 기준 점수는 읽기 전용 매핑 → 세션은 참조만 들고 복사하지 않음
+#  - 검색 인덱스도 카탈로그를 만들 때 함께 생성 (ko_KR / en_US)
+#  - RECHECK 초마다 공용 캐시의 config 버전을 확인하고, 바뀐 경우에만 새로 만듦
+# -------------------------------------------------
+LOCALE = "ko_KR"
+FALLBACK_LOCALE = "en_US"
+RECHECK = 300
+
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog")
+_lock = threading.Lock()
+_state = {"catalog": None, "checked": 0.0}
+
+
+class ChallengeInfo:
+    __slots__ = ("id", "name", "description", "thresholds", "rewards", "title_tier", "parent")
+
+    def __init__(self, cid, name, description, thresholds, rewards, parent=None):
+        self.id = cid
+        self.name = name
+        self.description = description
+        self.thresholds = thresholds
+        self.rewards = rewards  # ((티어, 보상 종류), ...) 티어 순
+        self.title_tier = next((tier for tier, kind in rewards if kind == 'TITLE'), None)
+        self.parent = parent
+
+    @property
+    def has_title(self):
+        return self.title_tier is not None
+
+    def rewards_at(self, tier):
+        """해당 티어 달성 시 받는 보상 종류들"""
+        return tuple(kind for t, kind in self.rewards if t == tier)
+
+
+EMPTY = ChallengeInfo(0, None, None, MappingProxyType({}), ())
+TIER_RANK = {tier: i for i, tier in enumerate(TIER_ORDER)}
+
+
+def _rewards(thresholds):
+    out = set()
+    for tier, val in thresholds.items():
+        if isinstance(val, dict) and 'rewards' in val:
+            for reward in val['rewards']:
+                kind = reward.get('type') or reward.get('category')
+                if kind:
+                    out.add((tier, kind))
+    return tuple(sorted(out, key=lambda r: (TIER_RANK.get(r[0], len(TIER_ORDER)), r[1])))
+
+
+def _threshold_value(th):
+    # 숫자 또는 {'value': .., 'rewards': [..]} 형태
+    if isinstance(th, dict):
+        th = th.get('value')
+    return th if isinstance(th, (int, float)) and not isinstance(th, bool) else None
+
+
+def _parent_id(cid, item, ids):
+    """상위 도전과제 id. config 에 parentId 가 있을 때만 (id 체계로 추정하지 않음)"""
+    parent = item.get('parentId')
+    try:
+        parent = int(parent)
+    except (TypeError, ValueError):
+        return None
+    return parent if parent in ids and parent != cid else None
+
+
+def _info(cid, item, ids):
+    names = item.get('localizedNames', {})
+    loc = names.get(LOCALE) or names.get(FALLBACK_LOCALE) or {}
+    raw = item.get('thresholds', {})
+    thresholds = {}
+    for tier, th in raw.items():
+        value = _threshold_value(th)
+        if value is not None:
+            thresholds[tier] = value
+    return ChallengeInfo(cid, loc.get('name'), loc.get('description'), MappingProxyType(thresholds),
+                         _rewards(raw), _parent_id(cid, item, ids))
+
+
+class Catalog:
+    __slots__ = ("version", "index", "_items")
+
+    def __init__(self, conf):
+        self.version = config_version(conf)
+        self.index = ChallengeIndex(conf, self.version)
+        items = {}
+        for cid, item in conf.items():
+            try:
+                items[int(cid)] = item
+            except (TypeError, ValueError):
+                continue
+        self._items = {cid: _info(cid, item, items) for cid, item in items.items()}
+
+    def get(self, cid):
+        """없는 도전과제면 빈 항목(EMPTY)"""
+        try:
+            return self._items.get(int(cid), EMPTY)
+        except (TypeError, ValueError):
+            return EMPTY
+
+    def __contains__(self, cid):
+        return self.get(cid) is not EMPTY
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def get_catalog(client):
+    """공유 카탈로그. config 를 아직 못 가져왔으면 None"""
+    now = time.time()
+    with _lock:
+        catalog = _state["catalog"]
+        if catalog is not None and now - _state["checked"] < RECHECK:
+            return catalog
+    conf = riot_api.get_challenge_config(client)
+    if not conf:
+        return catalog
+    version = config_version(conf)
+    with _lock:
+        catalog = _state["catalog"]
+        if catalog is None or catalog.version != version:
+            catalog = _state["catalog"] = Catalog(conf)
+        _state["checked"] = now
+        return catalog
+
+
+def load_async(client):
+    return _pool.submit(get_catalog, client)
@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+
+# -------------------------------------------------
+# 도전과제 검색 인덱스
+#  - ko_KR / en_US 이름과 설명으로 2-gram 역색인 (challenge_catalog 가 config 버전마다 한 번 생성)
+#  - 질의의 2-gram 목록을 교집합한 후보만 실제 부분 문자열 비교 → 전체 순회 없음
+#  - 초성 검색: 'ㅁㅈㅇ' 처럼 자음만 입력하면 초성 문자열에서 검색 (무작위 총력전 등)
+#  - 점진 검색: 새 질의가 같은 세션의 이전 질의를 포함하면 ('펜' → '펜타') 이전 결과 안에서만 걸러냄
+# -------------------------------------------------
+LOCALES = ("ko_KR", "en_US")
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+HANGUL_BASE = 0xAC00
+HANGUL_COUNT = 11172
+QUERY_CACHE_SIZE = 128
+
+_stats = {"memo_hits": 0, "refined": 0, "full": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(kind):
+    with _stats_lock:
+        _stats[kind] += 1
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def normalize(text):
+    return (text or "").replace("<br>", " ").lower()
+
+
+def to_choseong(text):
+    """'무작위 총력전' → 'ㅁㅈㅇ ㅊㄹㅈ' (한글 음절이 아닌 글자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - HANGUL_BASE
+        out.append(CHOSEONG[code // 588] if 0 <= code < HANGUL_COUNT else ch)
+    return "".join(out)
+
+
+def is_choseong_query(query):
+    chars = [ch for ch in query if not ch.isspace()]
+    return bool(chars) and all(ch in CHOSEONG_SET for ch in chars)
+
+
+def _grams(text):
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class _Postings:
+    """문서(도전과제)별 텍스트와 1-gram/2-gram 역색인"""
+
+    def __init__(self):
+        self.docs = {}
+        self.index = {}
+
+    def add(self, cid, text):
+        self.docs[cid] = text
+        for g in _grams(text) | set(text):
+            self.index.setdefault(g, set()).add(cid)
+
+    def search(self, query):
+        grams = sorted((self.index.get(g, ()) for g in _grams(query)), key=len)
+        if not grams or not grams[0]:
+            return set()
+        candidates = set(grams[0])
+        for posting in grams[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        if len(query) <= 2:
+            return candidates
+        return {cid for cid in candidates if query in self.docs[cid]}
+
+
+class ChallengeIndex:
+    def __init__(self, conf, version=None):
+        self.version = version
+        self.text = _Postings()
+        self.choseong = _Postings()
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        for cid, item in conf.items():
+            try:
+                cid = int(cid)
+            except (TypeError, ValueError):
+                continue
+            names = item.get('localizedNames', {})
+            fields = []
+            for loc in LOCALES:
+                n = names.get(loc) or {}
+                fields += [normalize(n.get('name')), normalize(n.get('description'))]
+            # 필드 경계를 넘는 일치가 없도록 줄바꿈으로 이어 붙임
+            text = "\n".join(f for f in fields if f)
+            self.text.add(cid, text)
+            self.choseong.add(cid, to_choseong(text))
+
+    def search(self, query, previous=None):
+        """일치하는 challengeId 집합. 빈 질의면 None (필터 없음)
+        previous=(이전 질의, 이전 결과) 이고 새 질의가 이전 질의를 포함하면 이전 결과만 검사
+        """
+        q = normalize(query).strip()
+        if not q:
+            return None
+        with self._lock:
+            hit = self._queries.get(q)
+            if hit is not None:
+                self._queries.move_to_end(q)
+                _count("memo_hits")
+                return hit
+        postings = self.choseong if is_choseong_query(q) else self.text
+        prev_q, prev_result = previous or (None, None)
+        if prev_q and prev_result is not None and prev_q in q and is_choseong_query(prev_q) == (postings is self.choseong):
+            # 새 질의와 일치하면 이전 질의와도 일치하므로 이전 결과가 후보 전체
+            result = frozenset(cid for cid in prev_result if q in postings.docs[cid])
+            _count("refined")
+        else:
+            result = frozenset(postings.search(q))
+            _count("full")
+        with self._lock:
+            self._queries[q] = result
+            while len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+        return result
+
+    def refine(self, query, session):
+        """세션별 점진 검색. session 은 세션마다 하나씩 두는 dict (이전 질의/결과 보관)"""
+        prev = session.get("prev")
+        previous = prev[1:] if prev and prev[0] == self.version else None
+        result = self.search(query, previous)
+        session["prev"] = (self.version, normalize(query).strip(), result)
+        return result
+
+
+def config_version(conf):
+    """설정 내용이 바뀌면 달라지는 값 (도전과제 id + 이름/설명 + 기준 점수/보상 + 상위 도전과제)"""
+    parts = []
+    for cid, item in conf.items():
+        names = item.get('localizedNames', {})
+        parts.append((cid, repr(item.get('thresholds')), item.get('parentId')) + tuple((names.get(loc) or {}).get(k) for loc in LOCALES for k in ('name', 'description')))
+    return hash(tuple(parts))
+
@@ -0,0 +1,227 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from cache_store import MemoryLRU, estimate_size
+
+# -------------------------------------------------
+# 플레이어 도전과제 열(column) 단위 테이블
+#  - challengeId / value / level(순서 있는 범주 코드) / percentile 을 NumPy 배열로 한 번만 구성
+#  - 필터·정렬은 위치 배열(np.ndarray)에 대한 벡터 연산 (ordered())
+#  - 정렬 순서(점수/티어 × 오름/내림)는 테이블을 만들 때 한 번만 계산한 순열로 보관
+#    → 필터는 불리언 마스크, 정렬은 순열에서 마스크에 걸린 위치만 고르는 O(n) 연산 (매 실행마다 정렬 없음)
+#  - 화면용 레코드(name_txt / desc_txt 포함)는 만들 때 한 번 복사해 두고 재사용
+#  - 카탈로그의 기준 점수로 (도전과제 × 티어) 행렬을 만들어
+#    다음 티어 / 이전·다음 기준 / 남은 점수 / 진행률을 한 번의 배열 연산으로 계산 (상세 모달도 step() 으로 같은 값 사용)
+#  - 카탈로그의 보상 색인으로 (도전과제 × 티어) 보상 여부 행렬 → '칭호 보상' / '다음 티어 보상' 필터도 마스크 연산
+# -------------------------------------------------
+TIER_ORDER = ['NONE', 'IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
+TIER_DTYPE = pd.CategoricalDtype(TIER_ORDER, ordered=True)
+MAX_TABLES = 64
+MAX_TABLE_BYTES = 64 * 1024 * 1024
+
+# 화면의 정렬 선택지 → (열, 내림차순 여부)
+SORT_OPTIONS = {
+    "점수 높은 순": ("value", True),
+    "점수 낮은 순": ("value", False),
+    "티어 높은 순": ("level", True),
+    "티어 낮은 순": ("level", False),
+    "점수순": ("value", True),
+    "티어순": ("level", True),
+}
+
+MAX_CODE = len(TIER_ORDER) - 1  # CHALLENGER
+
+
+def _number(x):
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+# 테이블 크기(nbytes)에 원본 데이터까지 포함해 예산 계산
+_tables = MemoryLRU(max_entries=MAX_TABLES, max_bytes=MAX_TABLE_BYTES, name="challenge-table")
+# 같은 객체로 다시 실행된 경우용 (id(data), id(catalog)) → 테이블. 약한 참조라 LRU 에서 빠진 테이블을 붙잡지 않음
+_by_obj = weakref.WeakValueDictionary()
+
+
+class ChallengeTable:
+    def __init__(self, data, catalog, key=None):
+        self.key = key  # (데이터 지문, 카탈로그 버전) — 렌더링 조각 캐시 키로도 사용
+        self.source = data  # 테이블이 살아 있는 동안 id(data) 가 재사용되지 않도록 참조 유지
+        self.catalog = catalog
+        items = data.get('challenges', [])
+        infos = [catalog.get(c['challengeId']) for c in items]
+        self.records = []
+        for c, info in zip(items, infos):
+            rec = dict(c)
+            rec['name_txt'] = info.name or 'Unknown'
+            rec['desc_txt'] = info.description or ''
+            self.records.append(rec)
+
+        n = len(items)
+        self.frame = pd.DataFrame({
+            "challengeId": np.fromiter((c['challengeId'] for c in items), dtype=np.int64, count=n),
+            "value": np.fromiter((c.get('value') or 0 for c in items), dtype=np.float64, count=n),
+            "level": pd.Categorical([c.get('level', 'NONE') for c in items], dtype=TIER_DTYPE),
+            "percentile": np.fromiter((c.get('percentile') or 0 for c in items), dtype=np.float64, count=n),
+            "name": [r['name_txt'] for r in self.records],
+            "desc": [r['desc_txt'] for r in self.records],
+        })
+        self.ids = self.frame["challengeId"].to_numpy()
+        self.values = self.frame["value"].to_numpy()
+        self.level_codes = self.frame["level"].cat.codes.to_numpy()
+        self._row_of = {int(cid): row for row, cid in enumerate(self.ids)}
+
+        # 기준 점수 행렬 (없는 티어는 NaN), 보상 여부 행렬
+        self.thresholds = np.full((n, len(TIER_ORDER)), np.nan)
+        self.reward_at = np.zeros((n, len(TIER_ORDER)), dtype=bool)
+        tier_col = {t: i for i, t in enumerate(TIER_ORDER)}
+        for row, info in enumerate(infos):
+            for tier, th in info.thresholds.items():
+                col = tier_col.get(tier)
+                if col is not None:
+                    self.thresholds[row, col] = th
+            for tier, _ in info.rewards:
+                col = tier_col.get(tier)
+                if col is not None:
+                    self.reward_at[row, col] = True
+        self.has_title = np.fromiter((info.has_title for info in infos), dtype=bool, count=n)
+        self._compute_next()
+        self._compute_orders()
+
+    def _compute_next(self):
+        rows = np.arange(len(self.ids))
+        vals = self.values
+        code = np.where(self.level_codes < 0, 0, self.level_codes).astype(np.int64)  # 알 수 없는 등급은 NONE 취급
+        is_max = code == MAX_CODE
+        is_none = code == 0
+        nxt = np.minimum(code + 1, MAX_CODE)
+
+        next_th = self.thresholds[rows, nxt]
+        # 기준이 없으면: NONE → 0, 그 외 → 현재 점수
+        next_th = np.where(np.isnan(next_th), np.where(is_none, 0.0, vals), next_th)
+        next_th = np.where(is_max, vals, next_th)
+
+        prev_col = np.where(is_max, MAX_CODE - 1, code)
+        prev_th = np.nan_to_num(self.thresholds[rows, prev_col], nan=0.0)
+        prev_th = np.where(is_none, 0.0, prev_th)
+
+        span = next_th - prev_th
+        with np.errstate(divide="ignore", invalid="ignore"):
+            progress = np.where(span > 0, (vals - prev_th) / span, 1.0)
+
+        self.next_codes = np.where(is_max, -1, nxt)
+        self.next_reward = ~is_max & self.reward_at[rows, nxt]
+        self.next_th = next_th
+        self.prev_th = prev_th
+        self.distance = next_th - vals
+        self.progress = np.clip(progress, 0.0, 1.0)
+
+    def _compute_orders(self):
+        # 점수 정렬: 같은 점수는 원래 순서 / 티어 정렬: 같은 티어는 점수 높은 순 → 원래 순서
+        by_value = np.argsort(-self.values, kind="stable")
+        levels = self.level_codes[by_value].astype(np.int16)
+        self._orders = {
+            ("value", True): by_value,
+            ("value", False): np.argsort(self.values, kind="stable"),
+            ("level", True): by_value[np.argsort(-levels, kind="stable")],
+            ("level", False): by_value[np.argsort(levels, kind="stable")],
+        }
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self):
+        """캐시 예산 계산용 대략적인 크기 (원본 데이터 + 레코드 + 프레임 + 배열)"""
+        arrays = (self.thresholds, self.reward_at, self.has_title, self.next_reward, self.next_codes, self.next_th, self.prev_th, self.distance, self.progress,
+                  *self._orders.values())
+        return (estimate_size(self.source) + estimate_size(self.records) + int(self.frame.memory_usage(deep=True).sum())
+                + sum(a.nbytes for a in arrays))
+
+    def mask(self, min_id=None, ids=None, title_only=False, next_reward=False):
+        """조건에 맞는 행이면 True 인 불리언 배열. ids=None 이면 검색 필터 없음
+        title_only: 칭호 보상이 있는 것만 / next_reward: 다음 티어 달성 시 보상이 있는 것만
+        """
+        if ids is None:
+            keep = np.ones(len(self.ids), dtype=bool)
+        else:
+            keep = np.zeros(len(self.ids), dtype=bool)
+            keep[[self._row_of[cid] for cid in ids if cid in self._row_of]] = True
+        if min_id is not None:
+            keep &= self.ids > min_id
+        if title_only:
+            keep &= self.has_title
+        if next_reward:
+            keep &= self.next_reward
+        return keep
+
+    def select(self, min_id=None, ids=None):
+        """조건에 맞는 행 위치 (원래 순서 유지)"""
+        return np.flatnonzero(self.mask(min_id, ids))
+
+    def ordered(self, option, min_id=None, ids=None, title_only=False, next_reward=False):
+        """조건에 맞는 행 위치를 정렬 선택지 순서로 (미리 계산한 순열 + 마스크, 정렬 없음)"""
+        keep = self.mask(min_id, ids, title_only, next_reward)
+        if option not in SORT_OPTIONS:
+            return np.flatnonzero(keep)
+        order = self._orders[SORT_OPTIONS[option]]
+        return order[keep[order]]
+
+    def position(self, cid):
+        """challengeId → 행 위치 (없으면 None)"""
+        return self._row_of.get(int(cid))
+
+    def next_tier(self, i):
+        code = self.next_codes[i]
+        return "MAX" if code < 0 else TIER_ORDER[code]
+
+    def diff(self, i):
+        return _number(self.distance[i])
+
+    def step(self, i):
+        """상세 모달용 (다음 티어, 이전 기준, 다음 기준, 진행률 0~1)"""
+        return self.next_tier(i), _number(self.prev_th[i]), _number(self.next_th[i]), float(self.progress[i])
+
+    def promotable(self, pos, max_distance=None):
+        """다음 티어가 있고 아직 도달하지 않은 위치들 (max_distance 이내만)"""
+        d = self.distance[pos]
+        mask = (self.next_codes[pos] >= 0) & (d > 0)
+        if max_distance is not None:
+            mask &= d <= max_distance
+        return pos[mask]
+
+    def nearest(self, pos, k):
+        """남은 점수가 작은 순 top-k (부분 선택 후 k개만 정렬, 같은 값은 기존 순서)"""
+        pos = self.promotable(pos)
+        d = self.distance[pos]
+        if len(d) > k:
+            kth = np.partition(d, k - 1)[k - 1]
+            keep = np.flatnonzero(d <= kth)
+            pos, d = pos[keep], d[keep]
+        return pos[np.argsort(d, kind="stable")[:k]]
+
+    def rows(self, pos):
+        return [self.records[i] for i in pos]
+
+
+def _fingerprint(data):
+    return hash(tuple((c['challengeId'], c.get('value'), c.get('level'), c.get('percentile'))
+                      for c in data.get('challenges', [])))
+
+
+def get_table(data, catalog):
+    """플레이어 데이터 + 카탈로그로 테이블을 한 번만 만들고 재사용"""
+    # 같은 객체로 다시 실행된 경우 (대부분의 rerun)
+    same = _by_obj.get((id(data), id(catalog)))
+    if same is not None and same.source is data and same.catalog is catalog:
+        _tables.get(same.key)  # LRU 순서 갱신
+        return same
+    key = (_fingerprint(data), catalog.version)
+    table = _tables.get(key)
+    if table is None:
+        table = ChallengeTable(data, catalog, key)
+        _tables.set(key, table)
+    _by_obj[(id(data), id(catalog))] = table
+    return table
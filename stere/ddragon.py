@@ -0,0 +1,148 @@
+import functools
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import http_record
+from cache_store import cached, peek
+from revalidate import conditional_get
+
+# -------------------------------------------------
+# Data Dragon 로컬 미러 (버전별)
+#  - 패치마다 champion.json 과 챔피언 정사각 이미지를 한 번만 내려받음
+#  - static/ddragon/{version}/ 아래에 저장 → Streamlit static 경로(app/static/...)로 제공
+#  - 새 버전이 나오면 파생 테이블(챔피언 맵)만 다시 만들고, 오래된 버전 폴더는 정리
+# -------------------------------------------------
+BASE_URL = "https://ddragon.leagueoflegends.com"
+VERSIONS_URL = f"{BASE_URL}/api/versions.json"
+LOCALE = "ko_KR"
+VERSION_TTL = 3600
+KEEP_VERSIONS = 2
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+MIRROR_DIR = os.path.join(STATIC_DIR, "ddragon")
+STATIC_URL = "app/static/ddragon"
+
+# OP.GG / DDragon 이미지 URL에서 챔피언 id 추출 (…/champion/Ahri.png?…)
+CHAMPION_IMG_RE = re.compile(r"/champion/([A-Za-z0-9]+)\.png")
+
+_session = http_record.install(requests.Session())
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddragon")
+_lock = threading.Lock()
+_derived = {"version": None, "champ_map": None}
+_building = set()
+_state = {"generation": 0}  # 미러에 이미지가 추가될 때마다 증가 → 렌더링 조각 캐시 키에 포함
+
+
+def _version_dir(version):
+    return os.path.join(MIRROR_DIR, version)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+@cached("ddragon-version", VERSION_TTL, key=lambda: ())
+def latest_version():
+    return conditional_get(functools.partial(_session.get, timeout=10), VERSIONS_URL, name="ddragon-versions", parse=lambda res: res.json()[0],
+                           current=lambda: peek("ddragon-version", ()))
+
+
+def load_champion_json(version):
+    path = os.path.join(_version_dir(version), "champion.json")
+    if not os.path.exists(path):
+        res = _session.get(f"{BASE_URL}/cdn/{version}/data/{LOCALE}/champion.json", timeout=10)
+        res.raise_for_status()
+        _write_atomic(path, res.content)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["data"]
+
+
+def get_champion_map(version):
+    """{championKey: {'name', 'id'}} — 버전이 바뀔 때만 다시 생성"""
+    with _lock:
+        if _derived["version"] == version:
+            return _derived["champ_map"]
+    data = load_champion_json(version)
+    champ_map = {v['key']: {'name': v['name'], 'id': v['id']} for v in data.values()}
+    with _lock:
+        _derived["version"] = version
+        _derived["champ_map"] = champ_map
+    return champ_map
+
+
+def image_path(version, champ_id):
+    """미러에 이미지가 있으면 로컬 파일 경로, 없으면 None"""
+    path = os.path.join(_version_dir(version), "img", "champion", f"{champ_id}.png")
+    return path if os.path.exists(path) else None
+
+
+def image_url(version, champ_id):
+    if image_path(version, champ_id):
+        return f"{STATIC_URL}/{version}/img/champion/{champ_id}.png"
+    return f"{BASE_URL}/cdn/{version}/img/champion/{champ_id}.png"
+
+
+def localize_img(src, version):
+    """외부 챔피언 이미지 URL을 미러 경로로 바꿈 (미러에 없으면 원래 URL 유지)"""
+    m = CHAMPION_IMG_RE.search(src or "")
+    if m and version and image_path(version, m.group(1)):
+        return image_url(version, m.group(1))
+    return src
+
+
+def _download_image(version, champ_id):
+    path = os.path.join(_version_dir(version), "img", "champion", f"{champ_id}.png")
+    if os.path.exists(path):
+        return
+    res = _session.get(f"{BASE_URL}/cdn/{version}/img/champion/{champ_id}.png", timeout=10)
+    if res.status_code == 200:
+        _write_atomic(path, res.content)
+        with _lock:
+            _state["generation"] += 1
+
+
+def mirror_generation():
+    """미러 내용이 바뀔 때마다 증가하는 값 (localize_img 결과가 달라지는 시점)"""
+    return _state["generation"]
+
+
+def _prune(keep_version):
+    if not os.path.isdir(MIRROR_DIR):
+        return
+    versions = sorted((v for v in os.listdir(MIRROR_DIR) if v != keep_version),
+                      key=lambda v: os.path.getmtime(os.path.join(MIRROR_DIR, v)), reverse=True)
+    for v in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(os.path.join(MIRROR_DIR, v), ignore_errors=True)
+
+
+def build_mirror(version):
+    data = load_champion_json(version)
+    list(_pool.map(lambda champ_id: _download_image(version, champ_id), [v['id'] for v in data.values()]))
+    _prune(version)
+
+
+def ensure_mirror_async(version):
+    """버전별로 한 번만 백그라운드에서 미러를 채움"""
+    with _lock:
+        if not version or version in _building:
+            return
+        _building.add(version)
+
+    def run():
+        try:
+            build_mirror(version)
+        except Exception:
+            with _lock:
+                _building.discard(version)
+
+    threading.Thread(target=run, name=f"ddragon-mirror-{version}", daemon=True).start()
@@ -0,0 +1,54 @@
+import hashlib
+import threading
+
+from cache_store import MemoryLRU
+
+# -------------------------------------------------
+# 렌더링된 HTML 조각 캐시
+#  - 챔피언 행 / 숙련도 카드 / 도전과제 카드 마크업을 (화면, 데이터 해시, 페이지, 정렬, 검색어, 언어 …) 키로 보관
+#  - 입력이 같은 rerun 은 f-string 을 다시 만들지 않고 같은 문자열을 재사용
+#  - 아이콘/챔피언 이미지 URL 이 들어간 조각은 icons.generation() / ddragon.mirror_generation() 도 키에 포함
+#    (로컬 파일이 생기기 전에 만든 원격 URL 마크업이 계속 재사용되지 않게)
+#  - 화면별 적중/실패 수와 적중률은 get_stats() 로 (test1.py 캐시 통계)
+# -------------------------------------------------
+MAX_FRAGMENTS = 512
+MAX_FRAGMENT_BYTES = 16 * 1024 * 1024
+
+_cache = MemoryLRU(max_entries=MAX_FRAGMENTS, max_bytes=MAX_FRAGMENT_BYTES, name="html-fragments")
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def data_key(obj):
+    """레코드 목록 등 → 짧은 해시 (키의 '데이터' 부분)"""
+    return hashlib.blake2b(repr(obj).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _count(view, kind):
+    with _stats_lock:
+        stats = _stats.setdefault(view, {"hits": 0, "misses": 0})
+        stats[kind] += 1
+
+
+def render(view, key, build):
+    """(view, key) 로 저장된 조각. 없으면 build() 결과를 저장해 돌려줌 (문자열 또는 문자열 튜플)"""
+    full_key = (view,) + tuple(key)
+    html = _cache.get(full_key)
+    if html is not None:
+        _count(view, "hits")
+        return html
+    html = build()
+    _cache.set(full_key, html)
+    _count(view, "misses")
+    return html
+
+
+def get_stats():
+    with _stats_lock:
+        views = {view: dict(v) for view, v in _stats.items()}
+    for v in views.values():
+        total = v["hits"] + v["misses"]
+        v["hit_rate"] = round(v["hits"] / total, 3) if total else 0.0
+    hits = sum(v["hits"] for v in views.values())
+    total = hits + sum(v["misses"] for v in views.values())
+    return {"hit_rate": round(hits / total, 3) if total else 0.0, "views": views}
@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+
+from requests.adapters import HTTPAdapter
+
+# -------------------------------------------------
+# HTTP 녹화 / 재생 서버 연결
+#  - LOL_HTTP_RECORD_DIR  : 설정하면 모든 응답(상태, 헤더, 본문)을 픽스처 파일로 저장
+#  - LOL_HTTP_BASE_URL    : 설정하면 https://{host}/{path} 요청을 {base}/{host}/{path} 로 보냄
+#                           (replay_server.py 재생 서버를 가리킬 때 사용)
+# -------------------------------------------------
+RECORD_DIR = os.environ.get("LOL_HTTP_RECORD_DIR")
+BASE_URL = os.environ.get("LOL_HTTP_BASE_URL")
+
+# 재생에 필요 없거나 본문과 맞지 않게 되는 헤더
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+_lock = threading.Lock()
+
+
+def fixture_name(method, url):
+    return hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest() + ".json"
+
+
+def standin_url(url, base=None):
+    """https://kr.api.riotgames.com/x → {base}/kr.api.riotgames.com/x"""
+    base = base or BASE_URL
+    if not base or not url.startswith("https://"):
+        return url
+    return f"{base.rstrip('/')}/{url[len('https://'):]}"
+
+
+def original_url(path):
+    """재생 서버 쪽: /kr.api.riotgames.com/x?y → https://kr.api.riotgames.com/x?y"""
+    return "https://" + path.lstrip("/")
+
+
+def save_fixture(record_dir, method, url, status, headers, body):
+    fixture = {
+        "method": method.upper(),
+        "url": url,
+        "status": status,
+        "headers": {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS},
+        "body_b64": base64.b64encode(body).decode("ascii"),
+    }
+    os.makedirs(record_dir, exist_ok=True)
+    path = os.path.join(record_dir, fixture_name(method, url))
+    with _lock:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+
+
+def load_fixtures(record_dir):
+    """{(METHOD, url): fixture}"""
+    fixtures = {}
+    for fn in os.listdir(record_dir):
+        if fn.endswith(".json"):
+            with open(os.path.join(record_dir, fn), encoding="utf-8") as f:
+                fx = json.load(f)
+            fx["body"] = base64.b64decode(fx.pop("body_b64"))
+            fixtures[(fx["method"], fx["url"])] = fx
+    return fixtures
+
+
+def _record_hook(res, *args, **kwargs):
+    # 304 는 본문이 없어 저장하면 같은 URL 의 200 픽스처를 덮어씀 (재생 서버가 ETag 로 304 를 직접 만듦)
+    if res.status_code == 304:
+        return res
+    req = res.request
+    save_fixture(RECORD_DIR, req.method, req.url, res.status_code, res.headers, res.content)
+    return res
+
+
+class StandInAdapter(HTTPAdapter):
+    """요청 URL만 재생 서버로 바꾸고 커넥션 풀은 그대로 사용"""
+
+    def send(self, request, **kwargs):
+        request.url = standin_url(request.url)
+        return super().send(request, **kwargs)
+
+
+def make_adapter(**pool_kwargs):
+    return StandInAdapter(**pool_kwargs) if BASE_URL else HTTPAdapter(**pool_kwargs)
+
+
+def install(session):
+    """세션에 녹화 훅을 달고, 재생 서버 설정 시 https:// 요청을 재생 서버로 돌림"""
+    if RECORD_DIR:
+        session.hooks["response"].append(_record_hook)
+    if BASE_URL:
+        session.mount("https://", StandInAdapter())
+    return session
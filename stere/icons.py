@@ -0,0 +1,199 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import http_record
+
+# -------------------------------------------------
+# 도전과제 토큰 아이콘 로컬 캐시
+#  - (challengeId, level) 아이콘을 static/challenges/ 에 미리 내려받아 app/static/... 로 제공
+#  - 내려받기 실패(404 등)한 아이콘은 기록해 두고 빈 칸으로 처리 (onerror 숨김 대체)
+#  - 페이지 단위 스프라이트 시트(선택, LOL_ICON_SPRITES=1): 20장의 카드를 이미지 1장으로
+#    아이콘 집합(정렬) 기준으로 이름을 붙여 정렬/페이지 순서가 달라도 재사용, 생성은 백그라운드 풀에서
+#    최근 MAX_SPRITES 개만 유지하고 나머지 파일은 삭제
+# -------------------------------------------------
+REMOTE_URL = "https://raw.communitydragon.org/latest/game/assets/challenges/config/{cid}/tokens/{level}.png"
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ICON_DIR = os.path.join(STATIC_DIR, "challenges")
+SPRITE_DIR = os.path.join(ICON_DIR, "sprites")
+STATIC_URL = "app/static/challenges"
+SPRITE_CELL = 64
+SPRITE_COLS = 5
+SPRITES_ENABLED = os.environ.get("LOL_ICON_SPRITES", "0") == "1"
+MAX_SPRITES = 200
+
+_session = http_record.install(requests.Session())
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="icons")
+_lock = threading.Lock()
+_pending = set()
+_missing = set()
+_sprites = OrderedDict()  # 이름 → 배치 (최근 사용 순, MAX_SPRITES 개까지)
+_building = set()
+_state = {"generation": 0}  # 내려받기가 끝날 때마다 증가 → 렌더링 조각 캐시 키에 포함
+
+
+def _key(cid, level):
+    return str(cid), (level or "NONE").lower()
+
+
+def token_path(cid, level):
+    cid, level = _key(cid, level)
+    path = os.path.join(ICON_DIR, cid, f"{level}.png")
+    return path if os.path.exists(path) else None
+
+
+def token_url(cid, level):
+    """로컬에 있으면 static 경로, 아직 없으면 원격 URL (다운로드 예약)"""
+    cid, level = _key(cid, level)
+    if token_path(cid, level):
+        return f"{STATIC_URL}/{cid}/{level}.png"
+    prefetch([(cid, level)])
+    return REMOTE_URL.format(cid=cid, level=level)
+
+
+def _download(cid, level):
+    path = os.path.join(ICON_DIR, cid, f"{level}.png")
+    try:
+        if not os.path.exists(path):
+            res = _session.get(REMOTE_URL.format(cid=cid, level=level), timeout=10)
+            if res.status_code == 200:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.tmp{threading.get_ident()}"
+                with open(tmp, "wb") as f:
+                    f.write(res.content)
+                os.replace(tmp, path)
+                with _lock:
+                    _state["generation"] += 1
+            elif res.status_code == 404:
+                with _lock:
+                    _missing.add((cid, level))
+                    _state["generation"] += 1
+    finally:
+        with _lock:
+            _pending.discard((cid, level))
+
+
+def generation():
+    """로컬 아이콘/없는 아이콘 목록이 바뀔 때마다 증가하는 값 (원격 URL 이 든 마크업을 다시 만들 때 기준)"""
+    return _state["generation"]
+
+
+def prefetch(pairs):
+    """[(challengeId, level), ...] 중 아직 없는 아이콘을 백그라운드로 내려받음"""
+    for cid, level in pairs:
+        key = _key(cid, level)
+        with _lock:
+            if key in _pending or key in _missing:
+                continue
+            if token_path(*key):
+                continue
+            _pending.add(key)
+        _pool.submit(_download, *key)
+
+
+def _build_sprite(keys, path):
+    from PIL import Image  # streamlit 의존성으로 함께 설치됨
+
+    rows = (len(keys) + SPRITE_COLS - 1) // SPRITE_COLS
+    sheet = Image.new("RGBA", (SPRITE_COLS * SPRITE_CELL, rows * SPRITE_CELL), (0, 0, 0, 0))
+    for i, key in enumerate(keys):
+        src = token_path(*key)
+        if not src:
+            continue
+        with Image.open(src) as im:
+            im = im.convert("RGBA")
+            im.thumbnail((SPRITE_CELL, SPRITE_CELL))
+            x = (i % SPRITE_COLS) * SPRITE_CELL + (SPRITE_CELL - im.width) // 2
+            y = (i // SPRITE_COLS) * SPRITE_CELL + (SPRITE_CELL - im.height) // 2
+            sheet.paste(im, (x, y), im)
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG", optimize=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(tmp, path)
+
+
+def _layout(keys, name):
+    rows = (len(keys) + SPRITE_COLS - 1) // SPRITE_COLS
+    url = f"{STATIC_URL}/sprites/{name}.png"
+    return {k: (url, (i % SPRITE_COLS) * SPRITE_CELL, (i // SPRITE_COLS) * SPRITE_CELL,
+                SPRITE_COLS * SPRITE_CELL, rows * SPRITE_CELL) for i, k in enumerate(keys)}
+
+
+def _prune_sprites():
+    # 호출 측에서 lock 보유. 목록에서 밀려난 스프라이트와 목록에 없는 오래된 파일 삭제
+    while len(_sprites) > MAX_SPRITES:
+        old, _ = _sprites.popitem(last=False)
+        try:
+            os.remove(os.path.join(SPRITE_DIR, f"{old}.png"))
+        except OSError:
+            pass
+    try:
+        files = [f for f in os.listdir(SPRITE_DIR)
+                 if f.endswith(".png") and f[:-4] not in _sprites and f[:-4] not in _building]
+    except OSError:
+        return
+    for f in files:
+        try:
+            os.remove(os.path.join(SPRITE_DIR, f))
+        except OSError:
+            pass
+
+
+def _make_sprite(keys, name):
+    path = os.path.join(SPRITE_DIR, f"{name}.png")
+    try:
+        if not os.path.exists(path):
+            _build_sprite(keys, path)
+        layout = _layout(keys, name)
+        with _lock:
+            _sprites[name] = layout
+            _prune_sprites()
+    except Exception:
+        pass
+    finally:
+        with _lock:
+            _building.discard(name)
+
+
+def page_sprite(pairs):
+    """페이지 아이콘 스프라이트가 준비돼 있으면 {(cid, level): (url, x, y, w, h)}, 아니면 None
+    (없으면 백그라운드에서 만들고 이번 실행은 개별 <img> 로 표시)
+    """
+    if not SPRITES_ENABLED or not pairs:
+        return None
+    keys = sorted({_key(cid, level) for cid, level in pairs})
+    if any(not token_path(*k) and k not in _missing for k in keys):
+        prefetch(keys)
+        return None
+    name = hashlib.sha1(repr(keys).encode("utf-8")).hexdigest()[:16]
+    with _lock:
+        layout = _sprites.get(name)
+        if layout is not None:
+            _sprites.move_to_end(name)
+            return layout
+        if name in _building:
+            return None
+        _building.add(name)
+    _pool.submit(_make_sprite, keys, name)
+    return None
+
+
+def icon_html(cid, level, size=60, style="", sprite=None):
+    """카드용 아이콘 마크업. 스프라이트가 있으면 배경 이미지 조각, 없으면 <img>, 없는 아이콘은 빈 칸"""
+    key = _key(cid, level)
+    if key in _missing:
+        return f'<div style="width:{size}px; height:{size}px; {style}"></div>'
+    if sprite and key in sprite:
+        url, x, y, w, h = sprite[key]
+        scale = size / SPRITE_CELL
+        return (f'<div style="width:{size}px; height:{size}px; display:inline-block; '
+                f'background:url({url}) -{x * scale:.0f}px -{y * scale:.0f}px / {w * scale:.0f}px {h * scale:.0f}px no-repeat; {style}"></div>')
+    return f'<img src="{token_url(*key)}" width="{size}" style="{style}" onerror="this.style.display=\'none\';">'
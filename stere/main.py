@@ -1,8 +1,6 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-import re
+from opgg_client import fetch_pages
+from opgg_parse import parse_champs, parse_mastery
 
 # -------------------------------------------------
 # 1. Page Config
@@ -92,66 +90,9 @@ def reset_search():
 # -------------------------------------------------
 # 4. Data Fetching Functions
 # -------------------------------------------------
-HEADERS = {"User-Agent": "Mozilla/5.0"}
-
-@st.cache_data(ttl=600)
 def fetch_data(name, tag):
-    encoded = f"{quote(name)}-{quote(tag)}"
-    try:
-        r_champ = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/champions", headers=HEADERS)
-        r_mastery = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/mastery", headers=HEADERS)
-        return r_champ.text, r_mastery.text
-    except:
-        return None, None
-
-def parse_champs(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    rows = soup.select("tbody tr")
-    result = []
-    for r in rows:
-        try:
-            txt = r.get_text(" ", strip=True).lower()
-            if "vs" in txt: continue
-            img = r.find("img")
-            if not img: continue
-            
-            w = re.search(r"(\d+)\s*승", txt)
-            l = re.search(r"(\d+)\s*패", txt)
-            wins = int(w.group(1)) if w else 0
-            losses = int(l.group(1)) if l else 0
-            if wins+losses == 0: continue
-            
-            result.append({
-                "name": img["alt"],
-                "img": img["src"],
-                "wins": wins,
-                "losses": losses
-            })
-            if len(result) == 9: break
-        except: continue
-    return result
-
-def parse_mastery(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    items = soup.select("div[data-tooltip-id^='opgg-tooltip']") 
-    if not items: items = soup.select("li > div > img")
-
-    result = []
-    for item in items[:7]:
-        try:
-            img = item.find("img")
-            score_span = item.find_next("span", string=re.compile(r"[\d,]+"))
-            
-            if not img: 
-                if item.name == 'img': img = item
-                else: continue
-            
-            score = score_span.text.strip() if score_span else "N/A"
-            result.append({"name": img.get("alt",""), "img": img.get("src",""), "score": score})
-        except: continue
-    return result
+    # champions / mastery 페이지를 동시에 요청
+    return fetch_pages(name, tag)
 
 # -------------------------------------------------
 # 5. Main Logic (View Switching)
@@ -208,7 +149,7 @@ else:
         
         if c_html:
             champs = parse_champs(c_html)
-            mastery = parse_mastery(m_html)
+            mastery = parse_mastery(m_html, limit=7)
             
             col1, col2 = st.columns([1.2, 0.8], gap="large")
 
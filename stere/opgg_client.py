@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+import http_record
+from cache_store import cached
+from opgg_parse import CHAMP_LIMIT, PageScanner
+
+# -------------------------------------------------
+# OP.GG 페이지 요청
+#  - champions / mastery 페이지를 동시에 요청 (왕복 1회 시간)
+#  - fetch_pages 결과는 공용 캐시 저장소에 PAGE_TTL 동안 보관 (cache_store.cached, stale-while-revalidate)
+#    → 앱 쪽 래퍼 함수는 따로 캐시하지 않음
+#  - 페이지별 마감 시간(deadline)을 넘기거나 200 이 아니면 해당 페이지만 None (공용 캐시에 저장하지 않음)
+#  - 스트리밍 모드(기본): 필요한 행/항목이 다 들어오면 나머지는 받지 않고 연결을 끊음
+#    (LOL_OPGG_STREAM=0 이면 전체 페이지를 받음)
+# -------------------------------------------------
+BASE_URL = "https://op.gg/ko/lol/summoners/kr"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+PAGE_DEADLINE = 8  # 초
+PAGE_TTL = 600
+MAX_WORKERS = 8
+STREAM_PAGES = os.environ.get("LOL_OPGG_STREAM", "1") != "0"
+# 앱들이 쓰는 최대 개수 (main.py 숙련도 7개)
+STREAM_LIMITS = {"champions": CHAMP_LIMIT, "mastery": 7}
+CHUNK_SIZE = 16 * 1024
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="opgg")
+_session = None
+_session_lock = threading.Lock()
+_stream_stats = {"pages": 0, "early_exit": 0, "timed_out": 0, "bytes_read": 0}
+_stats_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = http_record.install(requests.Session())
+            s.mount("https://", http_record.make_adapter(pool_connections=2, pool_maxsize=MAX_WORKERS))
+            s.headers.update(HEADERS)
+            _session = s
+        return _session
+
+
+def summoner_url(name, tag, page):
+    return f"{BASE_URL}/{quote(name)}-{quote(tag)}/{page}"
+
+
+def _get_body(url, deadline):
+    # 디코딩은 파서에 맡기고 응답 바이트 그대로 전달. 403/429/5xx 페이지는 예외 → None (캐시 안 됨)
+    res = get_session().get(url, timeout=deadline)
+    res.raise_for_status()
+    return res.content
+
+
+def _get_streaming(url, deadline, kind):
+    """필요한 부분까지만 읽은 응답 바이트 (잘린 HTML도 파서가 그대로 처리)
+    필요한 부분이 오기 전에 마감 시간을 넘기면 None (미완성 페이지를 파싱/캐시하지 않음)
+    """
+    scanner = PageScanner(kind, STREAM_LIMITS[kind])
+    end = time.monotonic() + deadline
+    buf = bytearray()
+    timed_out = False
+    with get_session().get(url, timeout=deadline, stream=True) as res:
+        res.raise_for_status()
+        for chunk in res.iter_content(CHUNK_SIZE):
+            buf += chunk
+            if scanner.feed_bytes(chunk):
+                break
+            if time.monotonic() > end:
+                timed_out = True
+                break
+    with _stats_lock:
+        _stream_stats["pages"] += 1
+        _stream_stats["early_exit"] += scanner.done
+        _stream_stats["timed_out"] += timed_out
+        _stream_stats["bytes_read"] += len(buf)
+    return None if timed_out else bytes(buf)
+
+
+def _fetch_page(name, tag, page, deadline):
+    url = summoner_url(name, tag, page)
+    if STREAM_PAGES and page in STREAM_LIMITS:
+        return _get_streaming(url, deadline, page)
+    return _get_body(url, deadline)
+
+
+def get_stream_stats():
+    """{pages: 스트리밍으로 받은 페이지 수, early_exit: 끝까지 받지 않은 수, timed_out: 마감으로 버린 수, bytes_read}"""
+    with _stats_lock:
+        return dict(_stream_stats)
+
+
+# 모든 페이지를 받아온 경우에만 공용 캐시에 저장
+@cached("opgg-pages-v2", PAGE_TTL, key=lambda name, tag, pages=("champions", "mastery"), **_: (name.strip().lower(), tag.strip().lower(), tuple(pages)),
+        cache_if=lambda pages: all(p is not None for p in pages))
+def fetch_pages(name, tag, pages=("champions", "mastery"), deadline=PAGE_DEADLINE):
+    """pages 순서대로 HTML(bytes)을 돌려줌. 실패하거나 마감을 넘긴 페이지는 None"""
+    futures = [_pool.submit(_fetch_page, name, tag, p, deadline) for p in pages]
+    end = time.monotonic() + deadline
+    result = []
+    for f in futures:
+        try:
+            result.append(f.result(timeout=max(0, end - time.monotonic())))
+        except Exception:
+            f.cancel()
+            result.append(None)
+    return tuple(result)
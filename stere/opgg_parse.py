@@ -0,0 +1,559 @@
+import codecs
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser as StreamTokenizer
+
+from bs4 import BeautifulSoup
+
+from cache_store import MemoryLRU
+
+# 선택 의존성: 설치돼 있으면 더 빠른 파서를 사용
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# -------------------------------------------------
+# OP.GG HTML 파서 (백엔드 교체 가능)
+#  - bs4        : BeautifulSoup + html.parser (순수 파이썬, 기준 구현)
+#  - lxml       : libxml2 트리 + XPath
+#  - selectolax : lexbor 엔진 + CSS 셀렉터
+#  - 응답 바이트(res.content)를 그대로 넘기면 디코딩도 파서가 처리
+#  - LOL_HTML_PARSER 로 강제 지정, 없으면 설치된 것 중 가장 빠른 백엔드
+#  - 추출 모드(LOL_OPGG_EXTRACT): auto(기본) = 페이지에 내장된 JSON 페이로드 우선, 없으면 DOM
+#                                 payload / dom = 한쪽만 사용
+#    스트리밍 조기 종료(PageScanner)도 같은 모드를 따름: dom 은 필요한 행까지만,
+#    auto / payload 는 페이로드 배열이 끝날 때까지 (페이로드가 없으면 페이지 끝까지) 읽음
+#  - 파싱 결과는 HTML 내용 해시로 메모리에 캐시 → 같은 페이지로 다시 실행될 때는 파싱 생략
+#  - 파싱은 별도 프로세스 풀에서 실행 (GIL을 잡고 있는 동안 다른 세션이 멈추지 않도록)
+#    LOL_PARSE_WORKERS = 워커 수 (기본: CPU 수, 최대 4 / 0이면 현재 스레드에서 파싱)
+# -------------------------------------------------
+PREFERRED = ("selectolax", "lxml", "bs4")
+CHAMP_LIMIT = 9
+MASTERY_LIMIT = 6
+
+WIN_RE = re.compile(r"(\d+)\s*승")
+LOSS_RE = re.compile(r"(\d+)\s*패")
+SCORE_RE = re.compile(r"[\d,]+")
+
+# 내장 페이로드: Next.js 스트리밍 청크(self.__next_f.push) 또는 __NEXT_DATA__ 스크립트
+FLIGHT_RE = re.compile(r"self\.__next_f\.push\((\[.*?\])\)</script>", re.S)
+NEXT_DATA_RE = re.compile(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+# 페이지별로 찾아볼 배열 키 (앞에 있을수록 우선)
+PAYLOAD_KEYS = {
+    "champions": ("champion_stats", "my_champion_stats", "most_champions"),
+    "mastery": ("champion_masteries", "masteries"),
+}
+
+PARSED_CACHE_SIZE = 256
+PARSED_CACHE_BYTES = 8 * 1024 * 1024
+PARSE_WORKERS = int(os.environ.get("LOL_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+# 워커당 대기열 길이 — 넘치면 제출하는 쪽(세션 스레드)이 자리가 날 때까지 기다림
+QUEUE_PER_WORKER = 2
+
+_parsed = MemoryLRU(max_entries=PARSED_CACHE_SIZE, max_bytes=PARSED_CACHE_BYTES, name="opgg-parse")
+_stats = {"payload": 0, "dom": 0, "cache_hits": 0}
+_stats_lock = threading.Lock()
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(max(1, PARSE_WORKERS) * QUEUE_PER_WORKER)
+_pool_stats = {"workers": PARSE_WORKERS, "submitted": 0, "inline": 0, "in_flight": 0, "max_in_flight": 0,
+               "queue_wait_s": 0.0, "parse_s": 0.0, "broken": 0}
+
+
+def _champ_record(txt, img_alt, img_src):
+    """행 텍스트(소문자)와 첫 이미지로 챔피언 기록 생성. 건너뛸 행이면 None"""
+    if "vs" in txt or img_alt is None or img_src is None:
+        return None
+    w = WIN_RE.search(txt)
+    l = LOSS_RE.search(txt)
+    wins = int(w.group(1)) if w else 0
+    losses = int(l.group(1)) if l else 0
+    if wins + losses == 0:
+        return None
+    return {"name": img_alt, "img": img_src, "wins": wins, "losses": losses}
+
+
+# --- bs4 ---
+def _champs_bs4(html, limit):
+    soup = BeautifulSoup(html, "html.parser")
+    result = []
+    for r in soup.select("tbody tr"):
+        img = r.find("img")
+        if not img:
+            continue
+        rec = _champ_record(r.get_text(" ", strip=True).lower(), img.get("alt"), img.get("src"))
+        if rec:
+            result.append(rec)
+            if len(result) == limit:
+                break
+    return result
+
+
+def _mastery_bs4(html, limit):
+    soup = BeautifulSoup(html, "html.parser")
+    items = soup.select("div[data-tooltip-id^='opgg-tooltip']") or soup.select("li > div > img")
+    result = []
+    for item in items[:limit]:
+        img = item.find("img") if item.name != 'img' else item
+        if not img:
+            continue
+        score_span = item.find_next("span", string=SCORE_RE)
+        score = score_span.text.strip() if score_span else "N/A"
+        result.append({"name": img.get("alt", ""), "img": img.get("src", ""), "score": score})
+    return result
+
+
+# --- lxml ---
+if lxml_html is not None:
+    # OP.GG 는 UTF-8 — meta 태그에 의존하지 않고 바이트를 바로 디코딩
+    _UTF8_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+    _ROW_TEXT = etree.XPath(".//text()", smart_strings=False)
+    # 항목 안쪽 → 뒤쪽 순서(문서 순서)로 숫자가 들어 있는 첫 번째 말단 span
+    _SCORE_SPAN = etree.XPath("(descendant::span | following::span)[not(*)][re:test(string(.), '[0-9,]')][1]",
+                              namespaces={"re": "http://exslt.org/regular-expressions"})
+
+
+def _lxml_root(html):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    return lxml_html.document_fromstring(html, parser=_UTF8_PARSER)
+
+
+def _champs_lxml(html, limit):
+    root = _lxml_root(html)
+    result = []
+    for r in root.xpath("//tbody//tr"):
+        img = r.find(".//img")
+        if img is None:
+            continue
+        txt = " ".join(s.strip() for s in _ROW_TEXT(r) if s.strip()).lower()
+        rec = _champ_record(txt, img.get("alt"), img.get("src"))
+        if rec:
+            result.append(rec)
+            if len(result) == limit:
+                break
+    return result
+
+
+def _mastery_lxml(html, limit):
+    root = _lxml_root(html)
+    items = root.xpath("//div[starts-with(@data-tooltip-id, 'opgg-tooltip')]") or root.xpath("//li/div/img")
+    result = []
+    for item in items[:limit]:
+        img = item if item.tag == "img" else item.find(".//img")
+        if img is None:
+            continue
+        spans = _SCORE_SPAN(item)
+        score = spans[0].text_content().strip() if spans else "N/A"
+        result.append({"name": img.get("alt", ""), "img": img.get("src", ""), "score": score})
+    return result
+
+
+# --- selectolax ---
+def _sx_following(node):
+    """node 자신과 하위 노드, 그 다음 문서 순서상 뒤에 오는 노드를 차례로"""
+    yield from node.traverse()
+    while node is not None:
+        sib = node.next
+        while sib is not None:
+            yield from sib.traverse()
+            sib = sib.next
+        node = node.parent
+
+
+def _sx_score(item):
+    for node in _sx_following(item):
+        if node.tag != "span" or any(True for _ in node.iter()):
+            continue
+        text = node.text()
+        if SCORE_RE.search(text):
+            return text.strip()
+    return "N/A"
+
+
+def _champs_selectolax(html, limit):
+    tree = HTMLParser(html)
+    result = []
+    for r in tree.css("tbody tr"):
+        img = r.css_first("img")
+        if img is None:
+            continue
+        attrs = img.attributes
+        rec = _champ_record(r.text(separator=" ", strip=True).lower(), attrs.get("alt"), attrs.get("src"))
+        if rec:
+            result.append(rec)
+            if len(result) == limit:
+                break
+    return result
+
+
+def _mastery_selectolax(html, limit):
+    tree = HTMLParser(html)
+    items = tree.css("div[data-tooltip-id^='opgg-tooltip']") or tree.css("li > div > img")
+    result = []
+    for item in items[:limit]:
+        img = item if item.tag == "img" else item.css_first("img")
+        if img is None:
+            continue
+        attrs = img.attributes
+        result.append({"name": attrs.get("alt") or "", "img": attrs.get("src") or "", "score": _sx_score(item)})
+    return result
+
+
+# --- 스트리밍 조기 종료 ---
+class PageScanner(StreamTokenizer):
+    """응답 조각을 받는 대로 토큰화해서 필요한 부분이 다 모였는지 판단
+
+    추출 모드가 dom 일 때 (DOM 행/항목 기준)
+      champions: 챔피언 행(tbody 안 tr, 이미지 + 승/패)이 limit개 끝나면 완료
+      mastery  : 툴팁 항목이 limit개 나오고, 마지막 항목의 점수 span까지 지나면 완료
+    auto / payload 일 때: 내장 페이로드 배열(PAYLOAD_KEYS)이 끝까지 들어오면 완료
+      페이로드는 DOM 행보다 뒤에 오므로 DOM 기준보다 더 많이 읽고,
+      페이로드가 없는 페이지는 끝까지 읽음 (DOM 대체 파싱에 전체 HTML 이 필요)
+    """
+
+    def __init__(self, kind, limit, mode=None):
+        super().__init__(convert_charrefs=True)
+        self.kind = kind
+        self.limit = limit
+        self.mode = mode or os.environ.get("LOL_OPGG_EXTRACT", "auto")
+        self.found = 0
+        self.done = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._tbody = 0
+        self._row = None
+        self._span = None
+        self._script = None
+        self._payload = []  # 지금까지 받은 페이로드 텍스트 조각
+        self._key_seen = False
+
+    def feed_bytes(self, chunk):
+        if not self.done:
+            self.feed(self._decoder.decode(chunk))
+        return self.done
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.mode != "dom":
+            if tag == "script":
+                self._script = []
+            return
+        if self.kind == "champions":
+            if tag == "tbody":
+                self._tbody += 1
+            elif tag == "tr" and self._tbody:
+                self._row = {"img": None, "text": []}
+            elif tag == "img" and self._row is not None and self._row["img"] is None:
+                a = dict(attrs)
+                self._row["img"] = (a.get("alt"), a.get("src"))
+        elif tag == "div" and (dict(attrs).get("data-tooltip-id") or "").startswith("opgg-tooltip"):
+            self.found += 1
+        elif tag == "span" and self.found >= self.limit:
+            self._span = []
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if self.mode != "dom":
+            if tag == "script" and self._script is not None:
+                self._scan_payload("".join(self._script))
+                self._script = None
+            return
+        if self.kind == "champions":
+            if tag == "tbody":
+                self._tbody = max(0, self._tbody - 1)
+            elif tag == "tr" and self._row is not None:
+                row, self._row = self._row, None
+                if row["img"] and _champ_record(" ".join(t for t in row["text"] if t).lower(), *row["img"]):
+                    self.found += 1
+                    self.done = self.found >= self.limit
+        elif tag == "span" and self._span is not None:
+            self.done = bool(SCORE_RE.search("".join(self._span)))
+            self._span = None
+
+    def _scan_payload(self, script):
+        text = script.strip()
+        if text.startswith("self.__next_f.push(") and text.endswith(")"):
+            try:
+                chunk = json.loads(text[len("self.__next_f.push("):-1])
+            except ValueError:
+                return
+            if len(chunk) < 2 or not isinstance(chunk[1], str):
+                return
+            text = chunk[1]
+        elif not text.startswith("{"):  # __NEXT_DATA__ 외의 스크립트
+            return
+        self._payload.append(text)
+        # 배열 키를 본 뒤에만 디코딩 시도 (배열이 여러 청크에 걸칠 수 있음)
+        keys = PAYLOAD_KEYS[self.kind]
+        if not self._key_seen:
+            self._key_seen = any(f'"{k}"' in text for k in keys)
+        if self._key_seen and _find_array("".join(self._payload), keys) is not None:
+            self.done = True
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+            return
+        if self._row is not None:
+            self._row["text"].append(data.strip())
+        if self._span is not None:
+            self._span.append(data)
+
+
+# --- 내장 JSON 페이로드 ---
+def _payload_text(html):
+    """페이로드가 들어 있는 JSON 텍스트 (스트리밍 청크는 이어 붙임). 없으면 None"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    if "__next_f" in html:
+        parts = []
+        for m in FLIGHT_RE.finditer(html):
+            try:
+                chunk = json.loads(m.group(1))
+            except ValueError:
+                continue
+            if len(chunk) > 1 and isinstance(chunk[1], str):
+                parts.append(chunk[1])
+        if parts:
+            return "".join(parts)
+    m = NEXT_DATA_RE.search(html)
+    return m.group(1) if m else None
+
+
+def _find_array(text, keys):
+    """키 바로 뒤의 배열만 잘라서 디코딩 (문서 전체를 파싱하지 않음)"""
+    decoder = json.JSONDecoder()
+    for key in keys:
+        for m in re.finditer(r'"%s"\s*:\s*\[' % re.escape(key), text):
+            try:
+                arr, _ = decoder.raw_decode(text, m.end() - 1)
+            except ValueError:
+                continue
+            if arr and all(isinstance(x, dict) for x in arr):
+                return arr
+    return None
+
+
+def _champion_info(obj):
+    """항목 → {'name', 'img'} (+ 둘 중 하나가 없으면 'champion_id')
+    워커 프로세스에서도 실행되므로 네트워크를 쓰지 않음 — 이름/이미지 보충은 _resolve_champions (부모 프로세스)
+    """
+    champ = obj.get("champion") if isinstance(obj.get("champion"), dict) else obj
+    info = {"name": champ.get("name"), "img": champ.get("image_url") or champ.get("image")}
+    if not (info["name"] and info["img"]):
+        cid = obj.get("champion_id", champ.get("id"))
+        if cid is None:
+            return None
+        info["champion_id"] = cid
+    return info
+
+
+def _resolve_champions(records):
+    """champion_id 만 있는 기록을 Data Dragon 챔피언 맵(공용 캐시)으로 채움. 못 찾으면 제외"""
+    pending = [r for r in records if "champion_id" in r]
+    if not pending:
+        return records
+    import ddragon  # 네트워크/파일 의존성이 있어 필요할 때만
+
+    try:
+        version = ddragon.latest_version()
+        champ_map = ddragon.get_champion_map(version) if version else {}
+    except Exception:
+        version, champ_map = None, {}
+    result = []
+    for r in records:
+        cid = r.pop("champion_id", None)
+        if cid is not None:
+            info = champ_map.get(str(cid))
+            if not info:
+                continue
+            r["name"] = r["name"] or info["name"]
+            r["img"] = r["img"] or ddragon.image_url(version, info["id"])
+        result.append(r)
+    return result
+
+
+def _champs_payload(html, limit):
+    text = _payload_text(html)
+    arr = _find_array(text, PAYLOAD_KEYS["champions"]) if text else None
+    if arr is None:
+        return None
+    result = []
+    for obj in arr:
+        wins = obj.get("win", obj.get("wins"))
+        losses = obj.get("lose", obj.get("losses"))
+        if losses is None and obj.get("play") is not None and wins is not None:
+            losses = obj["play"] - wins
+        if not isinstance(wins, int) or not isinstance(losses, int) or wins + losses == 0:
+            continue
+        info = _champion_info(obj)
+        if info is None:
+            continue
+        result.append(dict(info, wins=wins, losses=losses))
+        if len(result) == limit:
+            break
+    return result or None
+
+
+def _mastery_payload(html, limit):
+    text = _payload_text(html)
+    arr = _find_array(text, PAYLOAD_KEYS["mastery"]) if text else None
+    if arr is None:
+        return None
+    result = []
+    for obj in arr[:limit]:
+        points = obj.get("champion_points", obj.get("championPoints", obj.get("point")))
+        info = _champion_info(obj)
+        if info is None:
+            continue
+        score = f"{points:,}" if isinstance(points, int) else "N/A"
+        result.append(dict(info, score=score))
+    return result or None
+
+
+BACKENDS = {
+    "bs4": (_champs_bs4, _mastery_bs4),
+    "lxml": (_champs_lxml, _mastery_lxml),
+    "selectolax": (_champs_selectolax, _mastery_selectolax),
+}
+_INSTALLED = {"bs4": True, "lxml": lxml_html is not None, "selectolax": HTMLParser is not None}
+
+
+def available_backends():
+    return [name for name in PREFERRED if _INSTALLED[name]]
+
+
+def default_backend():
+    name = os.environ.get("LOL_HTML_PARSER")
+    if name and _INSTALLED.get(name):
+        return name
+    return available_backends()[0]
+
+
+def _extract(kind, html, limit, backend, mode):
+    """(기록 목록, 'payload' | 'dom') — 프로세스 풀 워커에서도 그대로 호출됨"""
+    mode = mode or os.environ.get("LOL_OPGG_EXTRACT", "auto")
+    idx = 0 if kind == "champions" else 1
+    if mode != "dom":
+        try:
+            result = (_champs_payload if idx == 0 else _mastery_payload)(html, limit)
+        except Exception:
+            result = None
+        if result is not None or mode == "payload":
+            return result or [], "payload"
+    return BACKENDS[backend][idx](html, limit), "dom"
+
+
+def _worker_extract(kind, html, limit, backend, mode):
+    start = time.time()
+    records, source = _extract(kind, html, limit, backend, mode)
+    return records, source, start, time.time()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 서버는 스레드가 많아 fork 대신 spawn으로 워커를 띄움
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _run_extract(kind, html, limit, backend, mode):
+    if PARSE_WORKERS <= 0:
+        with _pool_lock:
+            _pool_stats["inline"] += 1
+        return _extract(kind, html, limit, backend, mode)
+
+    submitted = time.time()
+    with _pool_slots:
+        with _pool_lock:
+            _pool_stats["submitted"] += 1
+            _pool_stats["in_flight"] += 1
+            _pool_stats["max_in_flight"] = max(_pool_stats["max_in_flight"], _pool_stats["in_flight"])
+        try:
+            records, source, start, end = _get_pool().submit(_worker_extract, kind, html, limit, backend, mode).result()
+        except BrokenProcessPool:
+            # 워커가 죽은 경우 풀을 새로 만들도록 하고 이번 요청은 현재 스레드에서 처리
+            _reset_pool()
+            with _pool_lock:
+                _pool_stats["broken"] += 1
+            return _extract(kind, html, limit, backend, mode)
+        finally:
+            with _pool_lock:
+                _pool_stats["in_flight"] -= 1
+    with _pool_lock:
+        _pool_stats["queue_wait_s"] += max(0.0, start - submitted)
+        _pool_stats["parse_s"] += end - start
+    return records, source
+
+
+def _count(records, source):
+    with _stats_lock:
+        _stats[source] += 1
+    return records
+
+
+def _parse(kind, html, limit, backend, mode, use_cache):
+    if not html:
+        return []
+    backend = backend or default_backend()
+    if not use_cache:
+        return _resolve_champions(_count(*_run_extract(kind, html, limit, backend, mode)))
+
+    data = html if isinstance(html, bytes) else html.encode("utf-8")
+    key = (kind, hashlib.blake2b(data, digest_size=16).hexdigest(), limit, backend, mode)
+    records = _parsed.get(key)
+    if records is None:
+        records = _count(*_run_extract(kind, html, limit, backend, mode))
+        _parsed.set(key, records)
+    else:
+        with _stats_lock:
+            _stats["cache_hits"] += 1
+    # 캐시에 든 기록이 화면 쪽에서 바뀌지 않도록 복사본을 돌려줌 (챔피언 id 보충은 이 프로세스에서)
+    return _resolve_champions([dict(r) for r in records])
+
+
+def parse_champs(html, limit=CHAMP_LIMIT, backend=None, mode=None, use_cache=True):
+    """챔피언 페이지 → [{'name', 'img', 'wins', 'losses'}] (최대 limit개)"""
+    return _parse("champions", html, limit, backend, mode, use_cache)
+
+
+def parse_mastery(html, limit=MASTERY_LIMIT, backend=None, mode=None, use_cache=True):
+    """숙련도 페이지 → [{'name', 'img', 'score'}] (최대 limit개)"""
+    return _parse("mastery", html, limit, backend, mode, use_cache)
+
+
+def get_stats():
+    """{payload: 내장 JSON으로 처리한 횟수, dom: DOM 파서로 넘어간 횟수, cache_hits: 파싱을 건너뛴 횟수}"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_pool_stats():
+    """프로세스 풀 지표: 제출/대기 중 작업 수, 누적 대기·파싱 시간(초)"""
+    with _pool_lock:
+        return dict(_pool_stats)
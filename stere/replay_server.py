@@ -0,0 +1,105 @@
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_record import load_fixtures, original_url
+
+# -------------------------------------------------
+# 녹화된 응답을 재생하는 로컬 대역 서버 (Riot API / OP.GG / DDragon / CommunityDragon)
+#  사용법
+#   1) 녹화:  LOL_HTTP_RECORD_DIR=fixtures streamlit run test1.py  (실제 서버로 한 번 사용)
+#   2) 재생:  python replay_server.py --fixtures fixtures --port 8765 --latency 0.05 --rate-429 0.1
+#   3) 앱 연결: LOL_HTTP_BASE_URL=http://localhost:8765 streamlit run test1.py
+# -------------------------------------------------
+
+
+def make_handler(fixtures, latency=0.0, jitter=0.0, rate_429=0.0, rate_5xx=0.0, retry_after=1):
+    stats = {"served": 0, "not_modified": 0, "missing": 0, "injected_429": 0, "injected_5xx": 0}
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, headers, body):
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            if latency or jitter:
+                time.sleep(latency + random.uniform(0, jitter))
+
+            if self.path == "/_stats":
+                self._send(200, {"Content-Type": "application/json"}, json.dumps(stats).encode())
+                return
+
+            roll = random.random()
+            if roll < rate_429:
+                stats["injected_429"] += 1
+                self._send(429, {"Retry-After": str(retry_after), "Content-Type": "application/json"},
+                           b'{"status": {"message": "Rate limit exceeded", "status_code": 429}}')
+                return
+            if roll < rate_429 + rate_5xx:
+                stats["injected_5xx"] += 1
+                self._send(503, {"Content-Type": "application/json"},
+                           b'{"status": {"message": "Service unavailable", "status_code": 503}}')
+                return
+
+            fx = fixtures.get((self.command, original_url(self.path)))
+            if fx is None:
+                stats["missing"] += 1
+                self._send(404, {"Content-Type": "application/json"},
+                           b'{"status": {"message": "No fixture recorded", "status_code": 404}}')
+                return
+
+            etag = fx["headers"].get("ETag") or fx["headers"].get("etag")
+            if etag and self.headers.get("If-None-Match") == etag:
+                stats["not_modified"] += 1
+                self._send(304, {"ETag": etag}, b"")
+                return
+
+            stats["served"] += 1
+            self._send(fx["status"], fx["headers"], fx["body"])
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve(fixture_dir, host="127.0.0.1", port=8765, **faults):
+    server = ThreadingHTTPServer((host, port), make_handler(load_fixtures(fixture_dir), **faults))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화된 HTTP 응답 재생 서버")
+    parser.add_argument("--fixtures", required=True, help="LOL_HTTP_RECORD_DIR 로 녹화한 폴더")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답마다 추가할 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연에 더할 무작위 범위(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After(초)")
+    args = parser.parse_args()
+
+    server = serve(args.fixtures, args.host, args.port, latency=args.latency, jitter=args.jitter,
+                   rate_429=args.rate_429, rate_5xx=args.rate_5xx, retry_after=args.retry_after)
+    print(f"재생 서버 실행 중: http://{args.host}:{args.port}  (LOL_HTTP_BASE_URL 로 지정)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
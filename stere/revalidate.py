@@ -0,0 +1,62 @@
+import threading
+
+from cache_store import get_store
+
+# -------------------------------------------------
+# 조건부 요청 (ETag / Last-Modified)
+#  - 마지막 응답의 검증자(validator: ETag / Last-Modified / 크기)만 캐시 저장소에 보관
+#  - 본문(파싱 결과)은 호출 측 캐시(cached())에 한 번만 저장 → current() 로 넘겨받음
+#  - 변경이 없으면 304 응답만 받고 current() 값을 그대로 사용. 현재 값이 없으면 조건 없이 요청
+# -------------------------------------------------
+VALIDATOR_TTL = 30 * 86400
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(name, field, amount=1):
+    with _stats_lock:
+        s = _stats.setdefault(name, {"hits": 0, "misses": 0, "bytes_saved": 0})
+        s[field] += amount
+
+
+def get_stats():
+    """{이름: {hits(304), misses(전체 다운로드), bytes_saved}}"""
+    with _stats_lock:
+        return {name: dict(s) for name, s in _stats.items()}
+
+
+def conditional_get(get, url, parse, name=None, current=None):
+    """get(url, headers=...)로 요청. 304면 current() 값, 200이면 parse(res) 결과를 반환. 그 외 None
+    current(): 호출 측 캐시에 있는 현재 값 (없으면 None)
+    """
+    name = name or url
+    store = get_store()
+    key = f"validator:{url}"
+    value = current() if current else None
+    saved = store.get(key) if value is not None else None
+
+    headers = {}
+    if saved:
+        if saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+
+    res = get(url, headers=headers)
+    if res.status_code == 304 and saved:
+        _count(name, "hits")
+        _count(name, "bytes_saved", saved.get("size", 0))
+        return value
+    if res.status_code != 200:
+        return None
+
+    value = parse(res)
+    _count(name, "misses")
+    if res.headers.get("ETag") or res.headers.get("Last-Modified"):
+        store.set(key, {
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "size": len(res.content),
+        }, VALIDATOR_TTL)
+    return value
@@ -0,0 +1,48 @@
+from urllib.parse import quote
+
+from cache_store import cached, peek
+from revalidate import conditional_get
+
+# -------------------------------------------------
+# Riot API 엔드포인트 함수 (riot_client.RiotClient 사용)
+#  - 도전과제 config는 플레이어와 무관하므로 공용 캐시 저장소(cache_store)에 24시간 보관
+#  - 모든 캐시는 stale-while-revalidate: 만료된 값을 먼저 돌려주고 백그라운드에서 갱신
+#  - 계정 조회와 config 로드를 동시에 시작, player-data는 PUUID 이후 연결
+# -------------------------------------------------
+ACCOUNT_URL = "https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{name}/{tag}"
+PLAYER_DATA_URL = "https://kr.api.riotgames.com/lol/challenges/v1/player-data/{puuid}"
+CONFIG_URL = "https://kr.api.riotgames.com/lol/challenges/v1/challenges/config"
+CONFIG_TTL = 86400
+PUUID_TTL = 7 * 86400
+PLAYER_DATA_TTL = 3600
+
+
+# Riot ID는 대소문자를 구분하지 않음
+@cached("puuid", PUUID_TTL, key=lambda client, name, tag: (name.strip().lower(), tag.strip().lower()))
+def get_puuid(client, name, tag):
+    res = client.get(ACCOUNT_URL.format(name=quote(name), tag=quote(tag)))
+    return res.json().get('puuid') if res.status_code == 200 else None
+
+
+@cached("player-data", PLAYER_DATA_TTL, key=lambda client, puuid: puuid)
+def get_player_data(client, puuid):
+    res = client.get(PLAYER_DATA_URL.format(puuid=puuid))
+    return res.json() if res.status_code == 200 else None
+
+
+# config는 키가 하나뿐 (클라이언트와 무관)
+@cached("challenge-config", CONFIG_TTL, key=lambda client: ())
+def get_challenge_config(client):
+    """{challengeId(str): config} — 동시 요청은 single-flight로 한 번만, 만료 후에는 백그라운드 갱신"""
+    # TTL이 지나도 변경이 없으면 304로 끝남 (다운로드/파싱 생략)
+    return conditional_get(client.get, CONFIG_URL, name="challenge-config",
+                           parse=lambda res: {str(item['id']): item for item in res.json()},
+                           current=lambda: peek("challenge-config", ()))
+
+
+def get_player_data_by_riot_id(client, name, tag):
+    """계정 조회 → player-data 순서로 연결 (config 로드는 호출 측에서 동시에 시작)"""
+    puuid = get_puuid(client, name, tag)
+    if not puuid:
+        return None
+    return get_player_data(client, puuid)
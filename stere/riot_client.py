@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+
+import http_record
+from singleflight import get_group
+
+# -------------------------------------------------
+# Riot API 공용 클라이언트
+#  - 라우팅 호스트(asia / kr)별 keep-alive 커넥션 풀
+#  - X-App-Rate-Limit / X-Method-Rate-Limit 헤더 기반 (count, seconds) 창별 슬라이딩 로그
+#    X-App-Rate-Limit-Count / X-Method-Rate-Limit-Count 로 다른 프로세스의 사용량까지 반영
+#  - 429 응답 시 Retry-After 만큼 대기 후 재시도
+#  - 동시에 들어온 동일 요청은 single-flight로 병합
+# -------------------------------------------------
+ROUTING_HOSTS = ("asia.api.riotgames.com", "kr.api.riotgames.com")
+
+# 첫 응답을 받기 전까지 사용할 기본값 (개발용 키 제한)
+DEFAULT_APP_LIMIT = "20:1,100:120"
+DEFAULT_METHOD_LIMIT = "20:1"
+
+# URL 경로 -> 메서드 이름 (메서드 제한은 엔드포인트 단위로 걸림)
+METHOD_PREFIXES = [
+    ("/riot/account/v1/accounts/by-riot-id/", "account-v1.by-riot-id"),
+    ("/lol/challenges/v1/player-data/", "challenges-v1.player-data"),
+    ("/lol/challenges/v1/challenges/config", "challenges-v1.config"),
+    ("/lol/spectator/v5/active-games/by-summoner/", "spectator-v5.active-game"),
+]
+
+
+def parse_rate_limit(header):
+    """'20:1,100:120' -> [(20, 1.0), (100, 120.0)]"""
+    limits = []
+    for part in (header or "").split(","):
+        try:
+            count, seconds = part.strip().split(":")
+            limits.append((int(count), float(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+def method_key(path):
+    for prefix, name in METHOD_PREFIXES:
+        if path.startswith(prefix):
+            return name
+    return path
+
+
+class WindowCounter:
+    """(count, seconds) 한 쌍에 대한 슬라이딩 로그 — 최근 window 초 안의 요청 시각을 기록
+    Riot 은 고정 창으로 세므로 버킷처럼 '가득 찬 상태 + 재충전' 을 허용하면 창 하나에 2배가 나감
+    """
+
+    def __init__(self, capacity, window):
+        self.capacity = capacity
+        self.window = window
+        self.log = deque()
+        self.blocked_until = 0.0
+
+    def _expire(self, now):
+        while self.log and self.log[0] <= now - self.window:
+            self.log.popleft()
+
+    def wait_time(self, now):
+        """요청 1개를 보낼 수 있을 때까지 기다려야 하는 시간(초)"""
+        self._expire(now)
+        wait = self.blocked_until - now
+        if len(self.log) >= self.capacity:
+            wait = max(wait, self.log[len(self.log) - self.capacity] + self.window - now)
+        return max(wait, 0.0)
+
+    def take(self, now):
+        self.log.append(now)
+
+    def sync(self, server_count, now):
+        # 서버가 센 개수(*-Count 헤더)가 더 많으면 (다른 프로세스/워커의 요청) 부족분을 지금 시각으로 채움
+        self._expire(now)
+        for _ in range(min(server_count, self.capacity) - len(self.log)):
+            self.log.append(now)
+
+
+class RateLimiter:
+    """(이름 -> 창 카운터 목록) 형태로 app / method 제한을 함께 관리"""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _ensure(self, key, header):
+        if key not in self._counters:
+            self._counters[key] = [WindowCounter(c, w) for c, w in parse_rate_limit(header)]
+
+    def acquire(self, keys):
+        # keys: [(이름, 기본 제한 헤더), ...] — 모든 창에 자리가 날 때까지 대기
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                for key, default in keys:
+                    self._ensure(key, default)
+                counters = [c for key, _ in keys for c in self._counters[key]]
+                wait = max((c.wait_time(now) for c in counters), default=0.0)
+                if wait <= 0:
+                    for c in counters:
+                        c.take(now)
+                    return
+            time.sleep(wait)
+
+    def update(self, key, header, count_header=None):
+        # 제한이 바뀌었으면 창을 다시 만들고(기록은 유지), *-Count 헤더로 서버 쪽 개수에 맞춤
+        limits = parse_rate_limit(header)
+        if not limits:
+            return
+        counts = {w: c for c, w in parse_rate_limit(count_header)}
+        with self._lock:
+            now = time.monotonic()
+            old = self._counters.get(key, [])
+            if [(c.capacity, c.window) for c in old] != limits:
+                old_by_window = {c.window: c for c in old}
+                new = []
+                for count, window in limits:
+                    counter = WindowCounter(count, window)
+                    prev = old_by_window.get(window)
+                    if prev:
+                        counter.log = prev.log
+                        counter.blocked_until = prev.blocked_until
+                    new.append(counter)
+                self._counters[key] = old = new
+            for counter in old:
+                if counter.window in counts:
+                    counter.sync(counts[counter.window], now)
+
+    def pause(self, keys, seconds):
+        # Retry-After 동안 해당 창들을 막아 다른 스레드도 같이 기다리게 함
+        with self._lock:
+            until = time.monotonic() + seconds
+            for key in keys:
+                for c in self._counters.get(key, []):
+                    c.blocked_until = max(c.blocked_until, until)
+
+
+class RiotClient:
+    def __init__(self, api_key, max_retries=3, pool_size=10, timeout=10):
+        self.headers = {
+            "X-Riot-Token": api_key,
+            "User-Agent": "Mozilla/5.0",
+            "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+        }
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.limiter = RateLimiter()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                s = http_record.install(requests.Session())
+                adapter = http_record.make_adapter(pool_connections=1, pool_maxsize=self.pool_size)
+                s.mount(f"https://{host}", adapter)
+                s.headers.update(self.headers)
+                self._sessions[host] = s
+            return self._sessions[host]
+
+    def get(self, url, **kwargs):
+        # 같은 URL/파라미터/헤더로 동시에 들어온 요청은 하나로 병합
+        key = (url, repr(sorted((kwargs.get("params") or {}).items())),
+               repr(sorted((kwargs.get("headers") or {}).items())))
+        return get_group("riot").do(key, lambda: self._get(url, **kwargs))
+
+    def _get(self, url, **kwargs):
+        parts = urlsplit(url)
+        host = parts.netloc
+        app_key = f"app:{host}"
+        m_key = f"method:{host}:{method_key(parts.path)}"
+        keys = [(app_key, DEFAULT_APP_LIMIT), (m_key, DEFAULT_METHOD_LIMIT)]
+        kwargs.setdefault("timeout", self.timeout)
+
+        res = None
+        for _ in range(self.max_retries + 1):
+            self.limiter.acquire(keys)
+            res = self.session(host).get(url, **kwargs)
+            self.limiter.update(app_key, res.headers.get("X-App-Rate-Limit"), res.headers.get("X-App-Rate-Limit-Count"))
+            self.limiter.update(m_key, res.headers.get("X-Method-Rate-Limit"), res.headers.get("X-Method-Rate-Limit-Count"))
+            if res.status_code != 429:
+                return res
+            try:
+                retry_after = float(res.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            self.limiter.pause([app_key, m_key], retry_after)
+            time.sleep(retry_after)
+        return res
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """API 키별로 하나의 클라이언트를 프로세스 전체에서 공유"""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = RiotClient(api_key)
+        return _clients[api_key]
@@ -0,0 +1,65 @@
+import threading
+
+# -------------------------------------------------
+# 단일 비행(single-flight) 요청 병합
+#  - 같은 키로 동시에 들어온 요청은 먼저 온 요청(leader) 하나만 실행
+#  - 나머지(follower)는 그 결과(또는 예외)를 그대로 공유
+# -------------------------------------------------
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "shared": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executed"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name):
+    """이름별 공용 SingleFlight (예: "cache", "riot")"""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight()
+        return _groups[name]
+
+
+def get_stats():
+    with _groups_lock:
+        return {name: dict(g.stats) for name, g in _groups.items()}
@@ -1,13 +1,25 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-import re
 import urllib.parse
 import plotly.graph_objects as go
 import math
 import random
 import time
+from riot_client import get_client
+import icons
+import challenge_catalog
+import challenge_table
+import card_grid
+import fragment_cache
+from riot_api import get_player_data_by_riot_id, get_puuid
+from opgg_client import fetch_pages, get_stream_stats
+from opgg_parse import parse_champs, parse_mastery, get_stats as get_parse_stats, get_pool_stats
+from cache_store import get_stats as get_cache_stats
+from challenge_index import get_stats as get_search_stats
+from fragment_cache import get_stats as get_fragment_stats
+from revalidate import get_stats as get_revalidate_stats
+from singleflight import get_stats as get_singleflight_stats
+import ddragon
 
 # -------------------------------------------------
 # 1. Page Config
@@ -41,6 +53,12 @@ if 'page_num' not in st.session_state:
     st.session_state.page_num = 1
 if 'search_query' not in st.session_state:
     st.session_state.search_query = ""
+
+# 검색창 변경 콜백 — 입력이 확정될 때(Enter/포커스 이동) 한 번만 반영, 추가 st.rerun() 없음
+def on_search_change():
+    st.session_state.search_query = st.session_state.search_box
+    st.session_state.page_num = 1
+
 if 'imminent_cache' not in st.session_state:
     st.session_state.imminent_cache = []
 if 'show_game_data' not in st.session_state:
@@ -53,8 +71,21 @@ if 'target_riot_id' not in st.session_state:
 # -------------------------------------------------
 # 4. CSS Styling
 # -------------------------------------------------
-st.markdown("""
-<style>
+# 카드 UI — 페이지와 카드 그리드 컴포넌트(iframe)에서 함께 사용
+CARD_CSS = """
+.challenge-card-inner {
+    background-color: #1e2328; border: 2px solid #3c3c44; border-radius: 6px;
+    padding: 10px; text-align: center; height: 280px; position: relative;
+    display: flex; flex-direction: column; align-items: center; justify-content: flex-start;
+}
+.card-detail {
+    margin-top: 8px; padding: 4px 0; width: 100%;
+    border: 1px solid #c8aa6e; border-radius: 4px; color: #c8aa6e; font-size: 0.85em;
+}
+.grid-card:hover .card-detail { background-color: #c8aa6e; color: #010a13; }
+"""
+
+st.markdown("<style>" + CARD_CSS + """
 /* 상단 헤더(Deploy 라인) 배경색 변경 */
 header[data-testid="stHeader"] {
     background-color: #010a13 !important;
@@ -84,12 +115,6 @@ div.stButton > button { background-color: #1e2328; color: #c8aa6e; border: 1px s
 div.stButton > button:hover { background-color: #c8aa6e; color: #010a13; border-color: #f0e6d2; }
 div[data-testid="stSelectbox"] > div > div { background-color: #1e2328; color: #f0e6d2; border: 1px solid #3c3c44; }
 
-/* 카드 UI */
-.challenge-card-inner {
-    background-color: #1e2328; border: 2px solid #3c3c44; border-radius: 6px;
-    padding: 10px; text-align: center; height: 280px; position: relative;
-    display: flex; flex-direction: column; align-items: center; justify-content: flex-start;
-}
 .champ-img { width: 45px; height: 45px; border-radius: 50%; border: 2px solid #c8aa6e; }
 .bar-bg { width: 100%; height: 8px; background: #0a0a0c; border-radius: 4px; overflow: hidden; }
 .bar-win { height: 100%; background: linear-gradient(90deg, #0ac8b9, #0a96a0); }
@@ -197,6 +222,13 @@ with st.sidebar:
         st.session_state['show_game_data'] = False # 메뉴 변경 시 인게임 정보 확장 해제
         st.rerun()
 
+    # 캐시 재검증(304) / 요청 병합 통계
+    with st.expander("📈 캐시 통계", expanded=False):
+        st.json({"revalidate": get_revalidate_stats(), "single_flight": get_singleflight_stats(),
+                 "opgg_parse": get_parse_stats(), "opgg_stream": get_stream_stats(),
+                 "parse_pool": get_pool_stats(), "memory_cache": get_cache_stats(),
+                 "search": get_search_stats(), "html_fragments": get_fragment_stats()})
+
 # -------------------------------------------------
 # 6. Helper Functions
 # -------------------------------------------------
@@ -204,73 +236,25 @@ def get_tier_color(tier):
     colors = {'IRON': '#585c62', 'BRONZE': '#8c523a', 'SILVER': '#86939e', 'GOLD': '#d4af37', 'PLATINUM': '#07c8b9', 'DIAMOND': '#6c88ba', 'MASTER': '#d153f5', 'GRANDMASTER': '#f03a3a', 'CHALLENGER': '#4baeff'}
     return colors.get(tier, '#3c3c44')
 
-HEADERS_SCRAP = {"User-Agent": "Mozilla/5.0"}
-@st.cache_data(ttl=600)
 def fetch_opgg_data(name, tag):
-    encoded = f"{quote(name)}-{quote(tag)}"
-    try:
-        r_champ = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/champions", headers=HEADERS_SCRAP)
-        r_mastery = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/mastery", headers=HEADERS_SCRAP)
-        return r_champ.text, r_mastery.text
-    except: return None, None
-
-def parse_champs(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    result = []
-    for r in soup.select("tbody tr"):
-        try:
-            txt = r.get_text(" ", strip=True).lower()
-            if "vs" in txt: continue
-            img = r.find("img")
-            if not img: continue
-            w = re.search(r"(\d+)\s*승", txt)
-            l = re.search(r"(\d+)\s*패", txt)
-            wins = int(w.group(1)) if w else 0
-            losses = int(l.group(1)) if l else 0
-            if wins+losses == 0: continue
-            result.append({"name": img["alt"], "img": img["src"], "wins": wins, "losses": losses})
-            if len(result) == 9: break
-        except: continue
-    return result
-
-def parse_mastery(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    items = soup.select("div[data-tooltip-id^='opgg-tooltip']") or soup.select("li > div > img")
-    result = []
-    for item in items[:6]:
-        try:
-            img = item.find("img") if item.name != 'img' else item
-            score_span = item.find_next("span", string=re.compile(r"[\d,]+"))
-            if not img: continue
-            score = score_span.text.strip() if score_span else "N/A"
-            result.append({"name": img.get("alt",""), "img": img.get("src",""), "score": score})
-        except: continue
-    return result
-
-HEADERS_API = {"X-Riot-Token": API_KEY, "User-Agent": "Mozilla/5.0"}
-
-# DDragon 챔피언 정보 가져오기 (ID -> 이름/이미지 매핑용)
-@st.cache_data(ttl=86400)
+    # champions / mastery 페이지를 동시에 요청
+    return fetch_pages(name, tag)
+
+riot = get_client(API_KEY)
+
+# DDragon 챔피언 정보 (ID -> 이름/이미지 매핑용) — 버전별 로컬 미러 사용
 def get_champion_map():
     try:
-        ver_res = requests.get("https://ddragon.leagueoflegends.com/api/versions.json")
-        version = ver_res.json()[0]
-        res = requests.get(f"https://ddragon.leagueoflegends.com/cdn/{version}/data/ko_KR/champion.json")
-        data = res.json()['data']
-        return {v['key']: {'name': v['name'], 'id': v['id']} for k, v in data.items()}, version
+        version = ddragon.latest_version()
+        if not version: return {}, "latest"
+        ddragon.ensure_mirror_async(version) # 패치당 한 번만 이미지 다운로드
+        return ddragon.get_champion_map(version), version
     except: return {}, "latest"
 
 # 소환사 정보(PUUID)만 가져오는 함수
-@st.cache_data(ttl=3600)
 def get_puuid_only(name, tag):
     try:
-        acc_url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{quote(name)}/{quote(tag)}"
-        acc_res = requests.get(acc_url, headers=HEADERS_API)
-        if acc_res.status_code == 200:
-            return acc_res.json().get('puuid')
-        return None
+        return get_puuid(riot, name, tag)
     except: return None
 
 # 인게임 정보 조회 함수 (에러 핸들링 강화)
@@ -279,7 +263,7 @@ def get_active_game(puuid):
         return {'error': 'API_KEY_MISSING'}
     try:
         url = f"https://kr.api.riotgames.com/lol/spectator/v5/active-games/by-summoner/{puuid}"
-        res = requests.get(url, headers=HEADERS_API)
+        res = riot.get(url)
         if res.status_code == 200:
             return res.json()
         elif res.status_code == 404:
@@ -293,25 +277,22 @@ def get_active_game(puuid):
     except Exception:
         return {'error': 'UNKNOWN_ERROR'}
 
-@st.cache_data(ttl=3600)
+def fetch_player_challenges(name, tag):
+    try:
+        return get_player_data_by_riot_id(riot, name, tag)
+    except: return None
+
 def get_player_data_api(name, tag):
+    # 카탈로그 로드를 먼저 시작해 계정 조회와 겹치게 함 (프로세스 공용·읽기 전용, 플레이어 캐시와 분리)
+    conf_future = challenge_catalog.load_async(riot)
+    data = fetch_player_challenges(name, tag)
     try:
-        acc_url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{quote(name)}/{quote(tag)}"
-        acc_res = requests.get(acc_url, headers=HEADERS_API)
-        if acc_res.status_code != 200: return None, None
-        puuid = acc_res.json().get('puuid')
-        
-        chal_url = f"https://kr.api.riotgames.com/lol/challenges/v1/player-data/{puuid}"
-        chal_res = requests.get(chal_url, headers=HEADERS_API)
-        
-        conf_url = f"https://kr.api.riotgames.com/lol/challenges/v1/challenges/config"
-        conf_res = requests.get(conf_url, headers=HEADERS_API)
-        
-        if chal_res.status_code == 200 and conf_res.status_code == 200:
-            config_map = {str(item['id']): item for item in conf_res.json()}
-            return chal_res.json(), config_map
-        return None, None
-    except: return None, None
+        conf = conf_future.result()
+    except Exception:
+        conf = None
+    if data and conf:
+        return data, conf
+    return None, None
 
 def make_donut(val, max_val, tier):
     per = (val/max_val*100) if max_val>0 else 0
@@ -338,42 +319,18 @@ def make_donut(val, max_val, tier):
     )
     return fig
 
-def calculate_next_level(challenge_info, config_info):
-    current_val = challenge_info.get('value', 0)
-    current_level = challenge_info.get('level', 'NONE')
-    thresholds = config_info.get('thresholds', {})
-    order = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
-    
-    prev_threshold = 0
-    next_tier = "MAX"
-    next_threshold = current_val
-
-    try:
-        curr_idx = order.index(current_level)
-        if curr_idx < len(order) - 1:
-            next_tier = order[curr_idx + 1]
-            next_threshold = thresholds.get(next_tier, current_val)
-            prev_threshold = thresholds.get(current_level, 0)
-        else:
-            next_tier = "MAX"
-            next_threshold = current_val
-            prev_threshold = thresholds.get('GRANDMASTER', 0)
-    except ValueError:
-        next_tier = 'IRON'
-        next_threshold = thresholds.get('IRON', 0)
-        prev_threshold = 0
-
-    return next_tier, prev_threshold, next_threshold
-
 @st.dialog("도전과제 상세 정보")
-def show_detail_modal(c, cfg):
+def show_detail_modal(table, cid):
+    i = table.position(cid)
+    c = table.records[i]
     level = c.get('level', 'NONE')
     
     color = get_tier_color(level)
     if level == 'GRANDMASTER': color = '#ff3b3b'
     if level == 'CHALLENGER': color = '#0099ff'
 
-    icon = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c['challengeId']}/tokens/{level.lower()}.png"
+    # 로컬 아이콘 캐시에 있으면 파일 경로, 없으면 원격 URL
+    icon = icons.token_path(c['challengeId'], level) or icons.token_url(c['challengeId'], level)
     
     c1, c2 = st.columns([1, 4], vertical_alignment="center")
     with c1: 
@@ -392,14 +349,10 @@ def show_detail_modal(c, cfg):
     </div>
     """, unsafe_allow_html=True)
 
-    next_tier, prev_th, next_th = calculate_next_level(c, cfg)
+    # 다음 티어 / 기준 점수 / 진행률은 테이블에서 미리 계산한 값
+    next_tier, prev_th, next_th, ratio = table.step(i)
     
     if next_tier != "MAX":
-        range_val = next_th - prev_th
-        current_progress = c.get('value', 0) - prev_th
-        if range_val <= 0: range_val = 1 
-        ratio = min(max(current_progress / range_val, 0.0), 1.0) 
-
         st.markdown(f"<div style='font-size:0.9em; margin-bottom:5px; color: #ccc;'>다음 단계: <span style='color:#0099ff; font-weight:bold;'>{next_tier}</span></div>", unsafe_allow_html=True)
         
         st.markdown(f"""
@@ -529,7 +482,6 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
                         elif game_data and 'participants' in game_data:
                             # 게임 정보 정상 로드
                             champ_map, d_ver = get_champion_map()
-                            champ_img_base = f"https://ddragon.leagueoflegends.com/cdn/{d_ver}/img/champion"
                             
                             team_blue = [] # Team ID 100
                             team_red = []  # Team ID 200
@@ -542,7 +494,8 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
                                 player_info = {
                                     'name': p_riot_id,
                                     'champ_name': c_info['name'],
-                                    'img': f"{champ_img_base}/{c_info['id']}.png" if c_info['id'] else "",
+                                    # 미러에 있으면 로컬 파일, 없으면 CDN
+                                    'img': (ddragon.image_path(d_ver, c_info['id']) or ddragon.image_url(d_ver, c_info['id'])) if c_info['id'] else "",
                                 }
 
                                 if p.get('teamId') == 100:
@@ -615,17 +568,18 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
             if c_html:
                 champs = parse_champs(c_html)
                 mastery = parse_mastery(m_html)
+                _, d_ver = get_champion_map()
                 
                 c1, c2 = st.columns([1.5, 1])
                 with c1:
                     st.subheader(f"모스트 픽 (최근 {t_name}#{t_tag})")
                     if not champs: st.warning("최근 랭크 데이터가 없습니다.")
-                    for c in champs:
+                    def champ_row(c):
                         tot = c['wins'] + c['losses']
                         rate = int(c['wins']/tot*100)
-                        st.markdown(f"""
+                        return f"""
                         <div style="display:flex; align-items:center; margin-bottom:8px;">
-                            <img src="{c['img']}" class="champ-img" style="margin-right:15px;">
+                            <img src="{ddragon.localize_img(c['img'], d_ver)}" class="champ-img" style="margin-right:15px;">
                             <div style="flex:1;">
                                 <div style="font-weight:bold; color:#f0e6d2;">{c['name']}</div>
                                 <div style="font-size:0.8em; color:#888;">{c['wins']}승 {c['losses']}패</div>
@@ -635,19 +589,27 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
                                 <span class="win-text">{rate}%</span>
                             </div>
                         </div>
-                        """, unsafe_allow_html=True)
+                        """
+
+                    # 같은 전적 데이터면 이전에 만든 마크업 재사용
+                    for row in fragment_cache.render("test1/champ-rows", (fragment_cache.data_key(champs), d_ver, ddragon.mirror_generation()), lambda: tuple(champ_row(c) for c in champs)):
+                        st.markdown(row, unsafe_allow_html=True)
                 with c2:
                     st.subheader(f"숙련도 ({t_name}#{t_tag})")
                     cols = st.columns(2)
-                    for i, m in enumerate(mastery):
+                    def mastery_card(m):
+                        return f"""
+                        <div style="background:#1e2328; padding:10px; border-radius:8px; text-align:center; margin-bottom:10px; border:1px solid #3c3c44;">
+                            <img src="{ddragon.localize_img(m['img'], d_ver)}" width="50" style="border-radius:50%;">
+                            <div style="font-size:0.9em; font-weight:bold; margin-top:5px;">{m['name']}</div>
+                            <div style="color:#e2b714; font-size:0.8em;">{m['score']}</div>
+                        </div>
+                        """
+
+                    mastery_html = fragment_cache.render("test1/mastery-cards", (fragment_cache.data_key(mastery), d_ver, ddragon.mirror_generation()), lambda: tuple(mastery_card(m) for m in mastery))
+                    for i, card_html in enumerate(mastery_html):
                         with cols[i%2]:
-                            st.markdown(f"""
-                            <div style="background:#1e2328; padding:10px; border-radius:8px; text-align:center; margin-bottom:10px; border:1px solid #3c3c44;">
-                                <img src="{m['img']}" width="50" style="border-radius:50%;">
-                                <div style="font-size:0.9em; font-weight:bold; margin-top:5px;">{m['name']}</div>
-                                <div style="color:#e2b714; font-size:0.8em;">{m['score']}</div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                            st.markdown(card_html, unsafe_allow_html=True)
             else:
                 st.error(f"OP.GG 데이터를 불러오지 못했습니다. ({t_name}#{t_tag} 확인)")
 
@@ -709,44 +671,27 @@ elif st.session_state.current_view == "도전과제 (API)":
             
             st.divider()
 
-            # 2. 데이터 전처리
-            challenges = [c for c in data.get('challenges', []) if c['challengeId'] > 10]
-            enriched_challenges = []
-            
-            for c in challenges:
-                cfg = conf.get(str(c['challengeId']), {})
-                loc = cfg.get('localizedNames', {}).get('ko_KR', {})
-                c['name_txt'] = loc.get('name', 'Unknown')
-                c['desc_txt'] = loc.get('description', '')
-                enriched_challenges.append(c)
+            # 2. 데이터 전처리 (플레이어별 열 단위 테이블 — 한 번 만들고 재사용)
+            table = challenge_table.get_table(data, conf)
+            enriched_challenges = table.rows(table.select(min_id=10))
+
+            # 플레이어의 모든 아이콘을 백그라운드로 미리 받아둠
+            icons.prefetch([(c['challengeId'], c.get('level', 'NONE')) for c in enriched_challenges])
 
             # 3. 컨트롤 패널
             col_search, col_sort, col_rand = st.columns([2, 1, 1], vertical_alignment="bottom")
             with col_search:
-                search_input = st.text_input("🔍 이름 검색", placeholder="도전과제명...", value=st.session_state.search_query, label_visibility="collapsed")
+                st.text_input("🔍 이름 검색", placeholder="도전과제명...", value=st.session_state.search_query, label_visibility="collapsed",
+                              key="search_box", on_change=on_search_change)
             with col_sort:
                 sort_opt = st.selectbox("정렬 기준", ["점수 높은 순", "점수 낮은 순", "티어 높은 순", "티어 낮은 순"], label_visibility="collapsed")
             with col_rand:
                 rand_btn = st.button("🎲 랜덤 뽑기", use_container_width=True)
 
-            if search_input != st.session_state.search_query:
-                st.session_state.search_query = search_input
-                st.session_state.page_num = 1
-                st.rerun()
-
-            # 4. 필터링
-            filtered = []
-            for c in enriched_challenges:
-                if st.session_state.search_query and (st.session_state.search_query not in c['name_txt'] and st.session_state.search_query not in c['desc_txt']):
-                    continue
-                filtered.append(c)
-
-            tier_order = ['NONE', 'IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
-            
-            if sort_opt == "점수 높은 순": filtered.sort(key=lambda x: x['value'], reverse=True)
-            elif sort_opt == "점수 낮은 순": filtered.sort(key=lambda x: x['value'])
-            elif sort_opt == "티어 높은 순": filtered.sort(key=lambda x: tier_order.index(x.get('level', 'NONE')), reverse=True)
-            elif sort_opt == "티어 낮은 순": filtered.sort(key=lambda x: tier_order.index(x.get('level', 'NONE')))
+            # 4. 필터링 (이전 검색어를 이어 입력한 경우 이전 결과 안에서만 검색)
+            matched = conf.index.refine(st.session_state.search_query, st.session_state.setdefault("search_refine", {}))
+            # filtered: 테이블 행 위치 배열 (정렬/페이지 나누기는 벡터 연산)
+            filtered = table.ordered(sort_opt, min_id=10, ids=matched)
 
             items_per_page = 20
             total_pages = math.ceil(len(filtered) / items_per_page)
@@ -784,7 +729,7 @@ elif st.session_state.current_view == "도전과제 (API)":
                     for i in range(total_frames):
                         pick = random.choice(enriched_challenges)
                         level = pick.get('level', 'NONE')
-                        icon = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{pick['challengeId']}/tokens/{level.lower()}.png"
+                        icon = icons.token_url(pick['challengeId'], level)
                         
                         spin_placeholder.markdown(f"""
                         <div class="challenge-card-inner spinning-card">
@@ -800,27 +745,20 @@ elif st.session_state.current_view == "도전과제 (API)":
                     
                     spin_placeholder.empty()
                     final_pick = random.choice(enriched_challenges)
-                    show_detail_modal(final_pick, conf.get(str(final_pick['challengeId']), {}))
+                    show_detail_modal(table, final_pick['challengeId'])
 
             # 6. 승급 임박 로직 (목록 고정)
             if show_imminent:
                 limit_diff = 500
 
                 if not st.session_state.imminent_cache:
-                    temp_list = []
-                    for c in enriched_challenges:
-                        cfg = conf.get(str(c['challengeId']), {})
-                        next_tier, _, next_th = calculate_next_level(c, cfg)
-                        if next_tier != "MAX":
-                            diff = next_th - c.get('value', 0)
-                            if 0 < diff <= limit_diff:
-                                temp_list.append({'c': c, 'diff': diff, 'next': next_tier, 'cfg': cfg})
-                    
-                    if temp_list:
-                        random.shuffle(temp_list)
-                        st.session_state.imminent_cache = temp_list[:4]
-                    else:
-                        st.session_state.imminent_cache = []
+                    # 남은 점수가 limit_diff 이내인 후보를 배열 연산으로 고른 뒤 4개만 무작위 추출
+                    cands = table.promotable(table.select(min_id=10), max_distance=limit_diff)
+                    picks = random.sample(list(cands), min(4, len(cands)))
+                    st.session_state.imminent_cache = [
+                        {'c': table.records[i], 'diff': table.diff(i), 'next': table.next_tier(i)}
+                        for i in picks
+                    ]
 
                 top_imminent = st.session_state.imminent_cache
 
@@ -830,19 +768,18 @@ elif st.session_state.current_view == "도전과제 (API)":
                     for i, item in enumerate(top_imminent):
                         c = item['c']
                         level = c.get('level', 'NONE')
-                        icon = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c['challengeId']}/tokens/{level.lower()}.png"
                         with i_cols[i]:
                             st.markdown(f"""
                             <div class="challenge-card-inner imminent-card" style="height:250px;">
                                 <div class="imminent-badge">D-{item['diff']:,}</div>
-                                <img src="{icon}" width="60" style="margin-bottom:10px;">
+                                {icons.icon_html(c['challengeId'], level, 60, style="margin-bottom:10px;")}
                                 <div style="font-weight:bold; color:#f0e6d2; font-size:0.9em; height:40px; overflow:hidden;">{c['name_txt']}</div>
                                 <div style="font-size:0.8em; color:#e0e0e0; height:40px; overflow:hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;">{c['desc_txt']}</div>
                                 <div style="font-size:0.8em; color:#aaa; margin-top:5px;">Next: <span style="color:{get_tier_color(item['next'])}">{item['next']}</span></div>
                             </div>
                             """, unsafe_allow_html=True)
                             if st.button("상세", key=f"imm_{c['challengeId']}", use_container_width=True):
-                                show_detail_modal(c, item['cfg'])
+                                show_detail_modal(table, c['challengeId'])
                 else:
                     st.info(f"💡 현재 설정된 기준({limit_diff}점) 이내의 승급 임박 과제가 없습니다.")
                     
@@ -851,29 +788,37 @@ elif st.session_state.current_view == "도전과제 (API)":
             # 7. 그리드 출력
             start_idx = (st.session_state.page_num - 1) * items_per_page
             end_idx = start_idx + items_per_page
-            current_items = filtered[start_idx:end_idx]
+            current_items = table.rows(filtered[start_idx:end_idx])
 
             st.markdown("<br>", unsafe_allow_html=True)
-            cols = st.columns(4)
-            for i, c in enumerate(current_items):
+            # 페이지 아이콘이 모두 로컬에 있으면 스프라이트 1장으로 표시
+            sprite = icons.page_sprite([(c['challengeId'], c.get('level', 'NONE')) for c in current_items])
+            # 카드 전체를 컴포넌트 하나로 렌더링, 눌린 카드의 상세 정보를 모달로
+            def challenge_card(c):
                 level = c.get('level', 'NONE')
                 color = get_tier_color(level)
-                icon = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c['challengeId']}/tokens/{level.lower()}.png"
-                
-                with cols[i%4]:
-                    st.markdown(f"""
+                return card_grid.card(c['challengeId'], f"""
                     <div class="challenge-card-inner" style="border-bottom:4px solid {color};">
-                        <img src="{icon}" width="60">
+                        {icons.icon_html(c['challengeId'], level, 60, sprite=sprite)}
                         <div style="font-weight:bold; margin:10px 0; height:45px; overflow:hidden; color:#f0e6d2;">{c['name_txt']}</div>
                         <div style="font-size:0.8em; color:#e0e0e0; height:40px; overflow:hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical;">{c['desc_txt']}</div>
                         <div style="margin-top:auto; width:100%;">
                             <div style="color:{color}; font-weight:bold;">{c['value']:,}</div>
                             <div style="color:{color}; font-size:0.8em;">{level}</div>
+                            <div class="card-detail">상세 정보</div>
                         </div>
                     </div>
-                    """, unsafe_allow_html=True)
-                    if st.button("상세 정보", key=f"btn_{c['challengeId']}", use_container_width=True):
-                        show_detail_modal(c, conf.get(str(c['challengeId']), {}))
+                    """)
+
+            # 같은 데이터/페이지/정렬/검색어면 이전에 만든 마크업 재사용
+            cards = fragment_cache.render("test1/challenge-cards", (table.key, st.session_state.page_num, items_per_page, sort_opt,
+                                                                  st.session_state.search_query, challenge_catalog.LOCALE, sprite is not None, icons.generation()),
+                                          lambda: tuple(challenge_card(c) for c in current_items))
+            clicked = card_grid.card_grid(cards, css=CARD_CSS, columns=4, key="challenge_grid")
+            if clicked is not None:
+                picked = next((c for c in current_items if str(c['challengeId']) == clicked), None)
+                if picked is not None:
+                    show_detail_modal(table, picked['challengeId'])
             
             st.markdown("<br>", unsafe_allow_html=True)
 
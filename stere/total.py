@@ -1,13 +1,17 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-import re
 import urllib.parse
 import plotly.graph_objects as go
 import math
 import random
 import time
+from riot_client import get_client
+import icons
+import challenge_catalog
+import challenge_table
+import fragment_cache
+from riot_api import get_player_data_by_riot_id
+from opgg_client import fetch_pages
+from opgg_parse import parse_champs, parse_mastery
 
 # -------------------------------------------------
 # 1. Page Config
@@ -115,72 +119,28 @@ def get_tier_color(tier):
     colors = {'IRON': '#585c62', 'BRONZE': '#8c523a', 'SILVER': '#86939e', 'GOLD': '#d4af37', 'PLATINUM': '#07c8b9', 'DIAMOND': '#6c88ba', 'MASTER': '#d153f5', 'GRANDMASTER': '#f03a3a', 'CHALLENGER': '#4baeff'}
     return colors.get(tier, '#3c3c44')
 
-HEADERS_SCRAP = {"User-Agent": "Mozilla/5.0"}
-@st.cache_data(ttl=600)
 def fetch_opgg_data(name, tag):
-    encoded = f"{quote(name)}-{quote(tag)}"
-    try:
-        r_champ = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/champions", headers=HEADERS_SCRAP)
-        r_mastery = requests.get(f"https://op.gg/ko/lol/summoners/kr/{encoded}/mastery", headers=HEADERS_SCRAP)
-        return r_champ.text, r_mastery.text
-    except: return None, None
-
-def parse_champs(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    result = []
-    for r in soup.select("tbody tr"):
-        try:
-            txt = r.get_text(" ", strip=True).lower()
-            if "vs" in txt: continue
-            img = r.find("img")
-            if not img: continue
-            w = re.search(r"(\d+)\s*승", txt)
-            l = re.search(r"(\d+)\s*패", txt)
-            wins = int(w.group(1)) if w else 0
-            losses = int(l.group(1)) if l else 0
-            if wins+losses == 0: continue
-            result.append({"name": img["alt"], "img": img["src"], "wins": wins, "losses": losses})
-            if len(result) == 9: break
-        except: continue
-    return result
+    # champions / mastery 페이지를 동시에 요청
+    return fetch_pages(name, tag)
 
-def parse_mastery(html):
-    if not html: return []
-    soup = BeautifulSoup(html, "html.parser")
-    items = soup.select("div[data-tooltip-id^='opgg-tooltip']") or soup.select("li > div > img")
-    result = []
-    for item in items[:6]:
-        try:
-            img = item.find("img") if item.name != 'img' else item
-            score_span = item.find_next("span", string=re.compile(r"[\d,]+"))
-            if not img: continue
-            score = score_span.text.strip() if score_span else "N/A"
-            result.append({"name": img.get("alt",""), "img": img.get("src",""), "score": score})
-        except: continue
-    return result
+riot = get_client(API_KEY)
 
-HEADERS_API = {"X-Riot-Token": API_KEY, "User-Agent": "Mozilla/5.0"}
+def fetch_player_challenges(name, tag):
+    try:
+        return get_player_data_by_riot_id(riot, name, tag)
+    except: return None
 
-@st.cache_data(ttl=3600)
 def get_player_data_api(name, tag):
+    # 카탈로그 로드를 먼저 시작해 계정 조회와 겹치게 함 (프로세스 공용·읽기 전용, 플레이어 캐시와 분리)
+    conf_future = challenge_catalog.load_async(riot)
+    data = fetch_player_challenges(name, tag)
     try:
-        acc_url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{quote(name)}/{quote(tag)}"
-        acc_res = requests.get(acc_url, headers=HEADERS_API)
-        if acc_res.status_code != 200: return None, None
-        puuid = acc_res.json().get('puuid')
-        
-        chal_url = f"https://kr.api.riotgames.com/lol/challenges/v1/player-data/{puuid}"
-        chal_res = requests.get(chal_url, headers=HEADERS_API)
-        
-        conf_url = f"https://kr.api.riotgames.com/lol/challenges/v1/challenges/config"
-        conf_res = requests.get(conf_url, headers=HEADERS_API)
-        
-        if chal_res.status_code == 200 and conf_res.status_code == 200:
-            config_map = {str(item['id']): item for item in conf_res.json()}
-            return chal_res.json(), config_map
-        return None, None
-    except: return None, None
+        conf = conf_future.result()
+    except Exception:
+        conf = None
+    if data and conf:
+        return data, conf
+    return None, None
 
 def make_donut(val, max_val, tier):
     per = (val/max_val*100) if max_val>0 else 0
@@ -226,10 +186,10 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
             with c1:
                 st.subheader("모스트 픽 (최근)")
                 if not champs: st.warning("최근 랭크 데이터가 없습니다.")
-                for c in champs:
+                def champ_row(c):
                     tot = c['wins'] + c['losses']
                     rate = int(c['wins']/tot*100)
-                    st.markdown(f"""
+                    return f"""
                     <div style="display:flex; align-items:center; margin-bottom:8px;">
                         <img src="{c['img']}" class="champ-img" style="margin-right:15px;">
                         <div style="flex:1;">
@@ -241,19 +201,27 @@ if st.session_state.current_view == "소환사 분석 (OP.GG)":
                             <span class="win-text">{rate}%</span>
                         </div>
                     </div>
-                    """, unsafe_allow_html=True)
+                    """
+
+                # 같은 전적 데이터면 이전에 만든 마크업 재사용
+                for row in fragment_cache.render("total/champ-rows", (fragment_cache.data_key(champs),), lambda: tuple(champ_row(c) for c in champs)):
+                    st.markdown(row, unsafe_allow_html=True)
             with c2:
                 st.subheader("숙련도")
                 cols = st.columns(2)
-                for i, m in enumerate(mastery):
+                def mastery_card(m):
+                    return f"""
+                    <div style="background:#1e2328; padding:10px; border-radius:8px; text-align:center; margin-bottom:10px; border:1px solid #3c3c44;">
+                        <img src="{m['img']}" width="50" style="border-radius:50%;">
+                        <div style="font-size:0.9em; font-weight:bold; margin-top:5px;">{m['name']}</div>
+                        <div style="color:#e2b714; font-size:0.8em;">{m['score']}</div>
+                    </div>
+                    """
+
+                mastery_html = fragment_cache.render("total/mastery-cards", (fragment_cache.data_key(mastery),), lambda: tuple(mastery_card(m) for m in mastery))
+                for i, card_html in enumerate(mastery_html):
                     with cols[i%2]:
-                        st.markdown(f"""
-                        <div style="background:#1e2328; padding:10px; border-radius:8px; text-align:center; margin-bottom:10px; border:1px solid #3c3c44;">
-                            <img src="{m['img']}" width="50" style="border-radius:50%;">
-                            <div style="font-size:0.9em; font-weight:bold; margin-top:5px;">{m['name']}</div>
-                            <div style="color:#e2b714; font-size:0.8em;">{m['score']}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(card_html, unsafe_allow_html=True)
         else:
             st.error("데이터를 불러오지 못했습니다.")
 
@@ -294,31 +262,19 @@ elif st.session_state.current_view == "도전과제 (API)":
             
             st.divider()
             
-            challenges = [c for c in data.get('challenges', []) if c['challengeId'] > 10]
+            table = challenge_table.get_table(data, conf)
             sc1, sc2 = st.columns([3, 1])
             search_q = sc1.text_input("검색", placeholder="도전과제 이름...")
             sort_opt = sc2.selectbox("정렬", ["점수순", "티어순"])
             
-            filtered = []
-            for c in challenges:
-                cfg = conf.get(str(c['challengeId']), {})
-                loc = cfg.get('localizedNames', {}).get('ko_KR', {})
-                name_txt = loc.get('name', 'Unknown')
-                desc_txt = loc.get('description', '')
-                if search_q and (search_q not in name_txt and search_q not in desc_txt): continue
-                c['name_txt'] = name_txt
-                c['desc_txt'] = desc_txt
-                filtered.append(c)
-            
-            tier_order = ['NONE', 'IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'DIAMOND', 'MASTER', 'GRANDMASTER', 'CHALLENGER']
-            if sort_opt == "점수순": filtered.sort(key=lambda x: x['value'], reverse=True)
-            else: filtered.sort(key=lambda x: tier_order.index(x.get('level', 'NONE')), reverse=True)
+            matched = conf.index.refine(search_q, st.session_state.setdefault("search_refine", {}))
+            filtered = table.rows(table.ordered(sort_opt, min_id=10, ids=matched)[:20])
             
             cols = st.columns(4)
-            for i, c in enumerate(filtered[:20]):
+            for i, c in enumerate(filtered):
                 level = c.get('level', 'NONE')
                 color = get_tier_color(level)
-                icon = f"https://raw.communitydragon.org/latest/game/assets/challenges/config/{c['challengeId']}/tokens/{level.lower()}.png"
+                icon = icons.token_url(c['challengeId'], level)
                 with cols[i%4]:
                     st.markdown(f"""
                     <div class="challenge-card-inner" style="border-bottom:4px solid {color}; margin-bottom:10px; height:260px;">